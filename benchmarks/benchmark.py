@@ -0,0 +1,413 @@
+"""
+    Замеры производительности валидации.
+
+    Только стандартная библиотека, сеть не нужна. Запуск из корня
+    репозитория:
+
+        PYTHONPATH=. python benchmarks/benchmark.py
+
+    Для каждого сценария выводится количество операций в секунду,
+    перцентили времени одной операции (создания одного экземпляра) и
+    пиковый объем памяти, выделенной за одну операцию (tracemalloc).
+
+    Сравнение с сохраненным базовым результатом (код возврата 1, если
+    какой-либо сценарий стал медленнее больше чем на --threshold):
+
+        PYTHONPATH=. python benchmarks/benchmark.py --compare
+
+    Сохранение нового базового результата:
+
+        PYTHONPATH=. python benchmarks/benchmark.py --save-baseline
+
+    Базовый результат зависит от машины, поэтому сравнивать имеет смысл
+    только замеры, сделанные на одной и той же машине.
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from os.path import dirname, join
+from typing import Callable, Dict, List, Optional, Union
+
+from validated_dc import ValidatedDC, get_errors
+
+try:
+    from typing import Literal
+except Exception:  # pragma: no cover
+    from typing_extensions import Literal
+
+
+BASELINE_PATH = join(dirname(__file__), 'baseline.json')
+
+
+# --- Схемы данных ---
+
+@dataclass
+class Flat(ValidatedDC):
+    name: str
+    age: int
+    weight: float
+    is_active: bool
+    comment: Optional[str] = None
+
+
+@dataclass
+class Phone(ValidatedDC):
+    phone: str
+    kind: Literal['personal', 'work'] = 'personal'
+
+
+@dataclass
+class Email(ValidatedDC):
+    email: str
+    kind: Literal['personal', 'work'] = 'work'
+
+
+@dataclass
+class Address(ValidatedDC):
+    city: str
+    zip_code: Optional[str] = None
+
+
+@dataclass
+class Person(ValidatedDC):
+    name: str
+    age: int
+    contact: Union[Phone, Email, List[Union[Phone, Email]]]
+    address: Address
+
+
+@dataclass
+class Workers(ValidatedDC):
+    person: Union[Person, List[Person]]
+
+
+@dataclass
+class Car(ValidatedDC):
+    car: str
+
+
+@dataclass
+class Boat(ValidatedDC):
+    boat: str
+
+
+@dataclass
+class Plane(ValidatedDC):
+    plane: str
+
+
+@dataclass
+class Train(ValidatedDC):
+    train: str
+
+
+@dataclass
+class Bike(ValidatedDC):
+    bike: str
+
+
+@dataclass
+class Bus(ValidatedDC):
+    bus: str
+
+
+@dataclass
+class Garage(ValidatedDC):
+    vehicles: List[Union[Car, Boat, Plane, Train, Bike, Bus]]
+
+
+@dataclass
+class Item(ValidatedDC):
+    id: int
+    title: str
+
+
+@dataclass
+class Numbers(ValidatedDC):
+    values: List[int]
+
+
+@dataclass
+class Items(ValidatedDC):
+    items: List[Item]
+
+
+@dataclass
+class Table(ValidatedDC):
+    rows: Dict[str, Item]
+
+
+STATUS = Literal['new', 'open', 'in_progress', 'review', 'done', 'closed']
+PRIORITY = Literal[1, 2, 3, 4, 5]
+
+
+@dataclass
+class Ticket(ValidatedDC):
+    status: STATUS
+    priority: PRIORITY
+    previous_status: STATUS
+    kind: Literal['bug', 'feature', 'task']
+    severity: Literal['low', 'medium', 'high', 'critical']
+    is_public: Literal[True, False]
+
+
+# --- Входные данные ---
+
+PERSON = {
+    'name': 'Peter',
+    'age': 30,
+    'contact': [
+        {'phone': '+7 900 000 00 00'},
+        {'email': 'peter@mail.com', 'kind': 'personal'},
+    ],
+    'address': {'city': 'Moscow', 'zip_code': '100000'},
+}
+
+TICKET = {
+    'status': 'open', 'priority': 3, 'previous_status': 'new',
+    'kind': 'bug', 'severity': 'high', 'is_public': True,
+}
+
+VEHICLES = [
+    {'car': 'a'}, {'boat': 'b'}, {'plane': 'c'},
+    {'train': 'd'}, {'bike': 'e'}, {'bus': 'f'},
+] * 10
+
+
+@dataclass
+class Case:
+    name: str           # Имя сценария
+    run: Callable       # Одна операция
+    number: int         # Количество операций для замера
+    is_valid: bool = True  # Ожидаемый результат операции
+
+
+def get_cases() -> List[Case]:
+    """
+        Возвращает все сценарии замеров.
+    """
+    numbers = list(range(10_000))
+    items = [{'id': i, 'title': str(i)} for i in range(1_000)]
+    rows = {str(i): {'id': i, 'title': str(i)} for i in range(1_000)}
+    batch = [
+        {'name': str(i), 'age': i, 'weight': 80.5, 'is_active': True}
+        for i in range(1_000)
+    ]
+
+    return [
+        Case('flat', lambda: Flat('Peter', 30, 80.5, True), 20_000),
+        Case('nested_person', lambda: Person(**PERSON), 5_000),
+        Case(
+            'nested_workers',
+            lambda: Workers(person=[PERSON, PERSON, PERSON]), 2_000
+        ),
+        Case('wide_union', lambda: Garage(vehicles=VEHICLES), 500),
+        Case('large_list_int', lambda: Numbers(values=numbers), 500),
+        Case('large_list_nested', lambda: Items(items=items), 20),
+        Case('large_dict_nested', lambda: Table(rows=rows), 20),
+        Case('literal_heavy', lambda: Ticket(**TICKET), 10_000),
+        Case(
+            'failure_flat',
+            lambda: Flat('Peter', '30', '80.5', 1), 10_000, False
+        ),
+        Case(
+            'failure_nested',
+            lambda: Person(**dict(PERSON, address={'city': 1})), 2_000,
+            False
+        ),
+        Case(
+            'failure_fail_fast',
+            lambda: Person.validate_dict(
+                dict(PERSON, age='30'), fail_fast=True
+            ), 5_000, False
+        ),
+        Case(
+            'validate_dict_person',
+            lambda: Person.validate_dict(PERSON), 5_000
+        ),
+        # Пакетная валидация в сравнении с обычным циклом
+        Case('batch_loop', lambda: [Flat(**item) for item in batch], 20),
+        Case('batch_validate_many', lambda: Flat.validate_many(batch), 20),
+    ]
+
+
+def check_case(case: Case) -> None:
+    """
+        Проверяет, что операция сценария дает ожидаемый результат
+        (а не замеряет, например, путь с исключением).
+    """
+    result = case.run()
+    if isinstance(result, ValidatedDC):
+        errors = get_errors(result)
+    elif isinstance(result, list):
+        # Список экземпляров
+        errors = [get_errors(item) for item in result if get_errors(item)]
+        errors = errors or None
+    elif isinstance(result, tuple):
+        errors = result[1] or None  # Результат validate_many()
+    else:
+        errors = result  # Результат validate_dict()
+
+    if (errors is None) != case.is_valid:
+        raise AssertionError(f'{case.name}: unexpected result {errors!r}')
+
+
+def measure_case(case: Case, scale: float) -> dict:
+    """
+        Замеряет сценарий и возвращает словарь с результатами.
+    """
+    run = case.run
+    number = max(1, int(case.number * scale))
+
+    check_case(case)
+
+    # Прогрев (в том числе построение планов валидации и кэшей аннотаций)
+    for _ in range(max(1, number // 10)):
+        run()
+
+    latencies = []
+    perf_counter = time.perf_counter
+    started = perf_counter()
+    for _ in range(number):
+        start = perf_counter()
+        run()
+        latencies.append(perf_counter() - start)
+    total = perf_counter() - started
+
+    # Пиковая память - отдельно, так как tracemalloc замедляет выполнение
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    latencies.sort()
+
+    return {
+        'number': number,
+        'ops_per_sec': round(number / total, 1),
+        'p50_us': round(get_percentile(latencies, 50) * 1e6, 2),
+        'p90_us': round(get_percentile(latencies, 90) * 1e6, 2),
+        'p99_us': round(get_percentile(latencies, 99) * 1e6, 2),
+        'peak_kib': round(max(0, peak - before) / 1024, 2),
+    }
+
+
+def get_percentile(sorted_values: List[float], percent: int) -> float:
+    """
+        Возвращает перцентиль percent отсортированного списка значений.
+    """
+    index = min(
+        len(sorted_values) - 1, int(len(sorted_values) * percent / 100)
+    )
+    return sorted_values[index]
+
+
+def run_benchmarks(names: Optional[List[str]], scale: float) -> dict:
+    """
+        Запускает сценарии (все, или только с именами из names) и
+        возвращает результаты в виде, в котором они хранятся в файле
+        базового результата.
+    """
+    results = {}
+    for case in get_cases():
+        if names and case.name not in names:
+            continue
+        results[case.name] = measure_case(case, scale)
+        print_result(case.name, results[case.name])
+
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cases': results,
+    }
+
+
+def print_result(name: str, result: dict) -> None:
+    print(
+        f"{name:<22} {result['ops_per_sec']:>12,.1f} ops/s  "
+        f"p50 {result['p50_us']:>9.2f} us  "
+        f"p90 {result['p90_us']:>9.2f} us  "
+        f"p99 {result['p99_us']:>9.2f} us  "
+        f"peak {result['peak_kib']:>9.2f} KiB"
+    )
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> bool:
+    """
+        Сравнивает результаты с базовыми. Возвращает False, если хотя бы
+        один сценарий стал медленнее больше чем на threshold (доля).
+    """
+    is_ok = True
+    print()
+    print(f"Baseline: Python {baseline.get('python')}")
+
+    for name, result in results['cases'].items():
+        base = baseline['cases'].get(name)
+        if base is None:
+            print(f'{name:<22} no baseline')
+            continue
+        ratio = result['ops_per_sec'] / base['ops_per_sec']
+        is_regression = ratio < 1 - threshold
+        if is_regression:
+            is_ok = False
+        print(
+            f"{name:<22} {ratio:>6.2f}x ops/s  "
+            f"peak {result['peak_kib'] - base['peak_kib']:>+9.2f} KiB"
+            f"{'  REGRESSION' if is_regression else ''}"
+        )
+
+    return is_ok
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument(
+        'names', nargs='*', help='scenarios to run (default: all)'
+    )
+    parser.add_argument(
+        '--scale', type=float, default=1.0,
+        help='multiplier for the number of operations (e.g. 0.1 for a '
+             'quick run)'
+    )
+    parser.add_argument(
+        '--baseline', default=BASELINE_PATH, help='baseline JSON file'
+    )
+    parser.add_argument(
+        '--save-baseline', action='store_true',
+        help='save the results as the new baseline'
+    )
+    parser.add_argument(
+        '--compare', action='store_true',
+        help='compare the results with the baseline'
+    )
+    parser.add_argument(
+        '--threshold', type=float, default=0.2,
+        help='allowed slowdown against the baseline (default: 0.2)'
+    )
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.names, args.scale)
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as file:
+            json.dump(results, file, indent=2)
+            file.write('\n')
+
+    if args.compare:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        if not compare(results, baseline, args.threshold):
+            return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
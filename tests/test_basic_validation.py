@@ -2,9 +2,17 @@
     Тесты класса BasicValidation.
 """
 import copy
+import pickle
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, fields
 
-from validated_dc import BasicValidation, get_errors, get_value_repr, is_valid
+import pytest
+
+from validated_dc import (
+    MAX_REPR, BasicValidation, BasicValidationError, LazyError,
+    ValidationContext, add_slots, get_errors, get_value_repr, is_valid
+)
 
 
 class СustomСlass:
@@ -28,6 +36,16 @@ class Foo(BasicValidation):
     cc: СustomСlass
 
 
+@add_slots
+@dataclass
+class SlotsFoo(BasicValidation):
+    """
+        Датакласс с валидацией и __slots__ для использования в тестах
+    """
+    i: int
+    s: str = 's'
+
+
 # Корректные данные для создания экземпляра Foo
 correct_input = {
     'i': 1,
@@ -118,16 +136,18 @@ def test_is_valid():
 
 def test_init_validation():
     """
-        Тест инициализации свойст необходимых для валидации.
-        (в данном случае только одно свойство - self._errors)
+        Тест инициализации валидации: создается новый контекст валидации с
+        пустым словарем ошибок.
     """
     # Возьмем произвольный экземпляр
     instance = Foo(**correct_input)
 
-    instance._errors__vdc == {1: 1}  # Присвоим любое непустое значение
+    ctx = instance._init_validation()
+    assert isinstance(ctx, ValidationContext)
+    assert ctx.errors == {}
 
-    instance._init_validation()
-    assert instance._errors__vdc == {}
+    # Каждый запуск валидации получает свой контекст
+    assert instance._init_validation() is not ctx
 
 
 def test_init_field_validation():
@@ -144,18 +164,22 @@ def test_init_field_validation():
     input_name, input_value = list(correct_input.items())[0]
 
     # Вызовем метот инициализации свойств для валидации этого поля
-    instance._init_field_validation(field)
+    ctx = ValidationContext()
+    instance._init_field_validation(field, ctx)
 
     # Проверим свойства необходимые для начала валидации поля:
 
     # ... список ошибок должен быть пустой
-    assert instance._field_errors__vdc == []
+    assert ctx.field_errors == []
     # ... должно быть сохранено имя поля
-    assert instance._field_name__vdc == input_name
+    assert ctx.field_name == input_name
     # ... должно быть сохранено значение поля
-    assert instance._field_value__vdc == input_value
+    assert ctx.field_value == input_value
     # ... должна быть сохранена аннотация поля
-    assert instance._field_annotation__vdc == type(input_value)
+    assert ctx.field_annotation == type(input_value)
+
+    # Сам экземпляр при этом не изменяется
+    assert not hasattr(instance, '_field_errors__vdc')
 
 
 def test_is_instance_true():
@@ -179,7 +203,7 @@ def test_is_instance_true():
 
     for type_, value in data.items():
         # Все проверки должны вернуть True
-        assert instance._is_instance__vdc(value, type_)
+        assert instance._is_instance__vdc(value, type_, ValidationContext())
 
 
 def test_is_instance_false():
@@ -201,17 +225,17 @@ def test_is_instance_false():
 
     data = {type(value): value for value in values}
 
-    # Подготовим гарантированно пустой список для ошибок
-    instance._field_errors__vdc = []
+    # Подготовим контекст с гарантированно пустым списком для ошибок
+    ctx = ValidationContext()
 
     for type_, value in data.items():
         value = 1 if value == '2' else '2'  # Обеспечим невалидность
         # Все проверки должны вернуть False
-        assert not instance._is_instance__vdc(value, type_)
+        assert not instance._is_instance__vdc(value, type_, ctx)
 
     # Ошибки были при проверке каждой items из data,
     # таким образом - длины списков должны быть равны
-    assert len(instance._field_errors__vdc) == len(values)
+    assert len(ctx.field_errors) == len(values)
 
 
 def test_is_instance_false_and_set_exception():
@@ -226,16 +250,16 @@ def test_is_instance_false_and_set_exception():
     # Возьмем валидный экземпляр
     instance = Foo(**correct_input)
 
-    # Подготовим гарантированно пустой список для ошибок
-    instance._field_errors__vdc = []
+    # Подготовим контекст с гарантированно пустым списком для ошибок
+    ctx = ValidationContext()
 
     # Вызовем метод с аргументами, которые поднимут исключение
-    result = instance._is_instance__vdc(1, 1)
+    result = instance._is_instance__vdc(1, 1, ctx)
     # Но метод его должен "погасить" и вернуть False
     assert not result
 
-    # а в instance._field_errors[0].exception должен быть экземпляр исключения
-    assert isinstance(instance._field_errors__vdc[0].exception, Exception)
+    # а в ошибке ctx.field_errors[0] должен быть экземпляр исключения
+    assert isinstance(ctx.field_errors[0].build().exception, Exception)
 
 
 def test_save_current_field_errors():
@@ -249,17 +273,21 @@ def test_save_current_field_errors():
     assert instance._errors__vdc == {}
 
     # Допустим, сейчас проверяли поле i, и его список ошибок не пуст
-    instance._field_name__vdc = 'i'
-    instance._field_errors__vdc = ['Просто строка для непустого списка', ]
+    ctx = instance._init_validation()
+    ctx.field_name = 'i'
+    ctx.field_errors = ['Просто строка для непустого списка', ]
 
     # Вызовем метод сохранения ошибки текущего поля
-    instance._save_current_field_errors()
+    instance._save_current_field_errors(ctx)
 
     # Словарь ошибок должен иметь ключ с именем поля и
     # значением равным списку ошибок
-    assert instance._errors__vdc[
-        instance._field_name__vdc
-    ] == instance._field_errors__vdc
+    assert ctx.errors[ctx.field_name] == ctx.field_errors
+
+    # Ошибки экземпляра изменятся только после завершения валидации
+    assert instance._errors__vdc == {}
+    instance._finish_validation(ctx)
+    assert instance._errors__vdc == ctx.errors
 
 
 def test_run_validation_call_init_validation():
@@ -273,6 +301,7 @@ def test_run_validation_call_init_validation():
         """
         def _init_validation(self):
             self._init_validation__succes = True  # Установим маркер
+            return super()._init_validation()
 
     instance = FakeBasicValidation()
     instance._init_validation__succes = False
@@ -296,7 +325,7 @@ def test_run_validation_call_is_field_valid():
         def __post_init__(self):
             self._field___names = []  # Создадим поле для проверки
 
-        def _is_field_valid__vdc(self, field):
+        def _is_field_valid__vdc(self, field, ctx):
             """
                 Фейковый метод валидации поля, просто сохраняет имя каждого
                 полученного поля.
@@ -313,6 +342,52 @@ def test_run_validation_call_is_field_valid():
     assert instance._field___names == ['i', 's']
 
 
+def test_get_validation_plan():
+    """
+        Тест плана валидации: он строится один раз и хранится в классе.
+    """
+    @dataclass
+    class Bar(Foo):
+        f: float = 0.1
+
+    plan = Foo._get_validation_plan__vdc()
+    assert plan == tuple(fields(Foo))
+    # Повторный вызов отдает тот же самый план
+    assert Foo._get_validation_plan__vdc() is plan
+
+    # У класса-потомка свой план
+    assert Bar._get_validation_plan__vdc() == tuple(fields(Bar))
+
+
+def test_string_annotations():
+    """
+        Тест строковых аннотаций: они вычисляются один раз для класса.
+    """
+    @dataclass
+    class Bar(BasicValidation):
+        i: 'int'
+        cc: 'СustomСlass'
+        unknown: 'UnknownClass' = None
+
+    instance = Bar(i=1, cc=СustomСlass())
+    field_types = Bar._get_field_types__vdc()
+    assert field_types['i'] is int
+    assert field_types['cc'] is СustomСlass
+    # Не вычисляемая аннотация - результат не сохраняется в классе, и
+    # аннотации вычисляются снова при следующем обращении
+    assert '_field_types__vdc' not in Bar.__dict__
+    assert Bar._get_field_types__vdc() == field_types
+
+    errors = get_errors(instance)
+    # Не вычисляемая аннотация - ошибка валидации только этого поля
+    assert list(errors) == ['unknown']
+    assert errors['unknown'][0].annotation == 'UnknownClass'
+    assert errors['unknown'][0].exception
+
+    instance = Bar(i='1', cc=СustomСlass(), unknown=1)
+    assert get_errors(instance)['i'][0].annotation is int
+
+
 def test_run_validation_call_save_current_field_errors():
     """
         Тест записи ошибки поля (если она есть) при старте валидации
@@ -347,3 +422,275 @@ def test_get_value_repr():
     v2 = [1, 2, 3, 4, 5, 6, 7, 8, 9, 0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 0]
     v2_repr = '[1, 2, 3, 4, 5, 6, 7, 8, 9...]'
     assert get_value_repr(v2) == v2_repr
+
+    # Для контейнеров результат тот же, что и при обрезании str(value)
+    values = (
+        [], (), {}, (1, ), [None, 'a'], {'a': [1, 2], 'b': (3, )},
+        list(range(100)), tuple(range(100)), {i: str(i) for i in range(100)},
+        [list(range(100)), 1], [(1, ), {'k' * 100: 'v'}], ['s' * 5, 2],
+        {1: {2: {3: {4: {5: {6: {7: {8: {9: 0}}}}}}}}},
+    )
+    for value in values:
+        expected = str(value)
+        if len(expected) > MAX_REPR:
+            expected = expected[:MAX_REPR-4] + '...' + expected[-1]
+        assert get_value_repr(value) == expected
+
+
+def test_lazy_error():
+    """
+        Тест отложенных ошибок: датаклассы ошибок создаются только при
+        запросе ошибок.
+    """
+    nocorrect_input = copy.copy(correct_input)
+    nocorrect_input['s'] = list(range(10**6))
+    instance = Foo(**nocorrect_input)
+
+    # Внутри хранятся отложенные ошибки
+    error = instance._errors__vdc['s'][0]
+    assert isinstance(error, LazyError)
+    # Контейнер не хранится, его представление вычислено сразу
+    assert error.value is None
+    value_repr = get_value_repr(nocorrect_input['s'])
+    assert error.value_repr == value_repr
+
+    # Изменения значения после валидации не попадают в ошибку
+    nocorrect_input['s'][0] = 'changed'
+    assert get_value_repr(nocorrect_input['s']) != value_repr
+
+    # get_errors() создает датаклассы ошибок
+    errors = get_errors(instance)
+    assert errors['s'] == [BasicValidationError(
+        value_repr=value_repr, value_type=list,
+        annotation=str, exception=None
+    )]
+    # ... и сохраняет их
+    assert get_errors(instance)['s'][0] is errors['s'][0]
+
+
+def test_run_validation_in_threads():
+    """
+        Тест одновременной валидации одного экземпляра из нескольких
+        потоков: состояние валидации у каждого потока свое.
+    """
+    instance = Foo(**correct_input)
+    nocorrect_instance = Foo(**correct_input)
+    nocorrect_instance.s = 2
+
+    def validate(_):
+        return is_valid(instance), is_valid(nocorrect_instance)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(validate, range(200)))
+
+    assert results == [(True, False)] * 200
+    assert set(get_errors(nocorrect_instance).keys()) == {'s'}
+
+
+def test_add_slots():
+    """
+        Тест декоратора add_slots(): у экземпляров нет __dict__, а валидация
+        работает как обычно.
+    """
+    instance = SlotsFoo(i=1)
+
+    assert not hasattr(instance, '__dict__')
+    assert SlotsFoo.__slots__ == ('i', 's')
+    assert instance.s == 's'
+    assert get_errors(instance) is None
+
+    instance.i = '1'
+    assert not is_valid(instance)
+    assert set(get_errors(instance).keys()) == {'i'}
+
+    # Экземпляр меньше, чем экземпляр такого же класса без слотов
+    @dataclass
+    class DictFoo(BasicValidation):
+        i: int
+        s: str = 's'
+
+    dict_instance = DictFoo(i=1)
+    assert sys.getsizeof(instance) < (
+        sys.getsizeof(dict_instance) + sys.getsizeof(vars(dict_instance))
+    )
+
+    # Экземпляр можно сериализовать
+    assert pickle.loads(pickle.dumps(instance)) == instance
+
+    # Нельзя применить к классу, у которого уже есть __slots__
+    with pytest.raises(TypeError):
+        add_slots(SlotsFoo)
+
+    # Слот для множества изменений - только при отслеживании присваиваний
+    assert BasicValidation.__slots__ == ('_errors__vdc', )
+
+    @add_slots
+    @dataclass
+    class TrackedSlotsFoo(BasicValidation):
+        _track_changes__vdc = True
+
+        i: int
+
+    assert TrackedSlotsFoo.__slots__ == ('i', '_changed__vdc')
+    instance = TrackedSlotsFoo(i=1)
+    assert not hasattr(instance, '__dict__')
+    instance.i = 'i'
+    assert instance._changed__vdc == {'i'}
+    assert not is_valid(instance)
+
+
+def test_add_slots_super():
+    """
+        Тест декоратора add_slots(): в методах нового класса работает
+        super() без аргументов.
+    """
+    @add_slots
+    @dataclass
+    class SuperFoo(BasicValidation):
+        i: int
+
+        def __post_init__(self) -> None:
+            super().__post_init__()
+
+        @property
+        def double(self) -> int:
+            return super().__getattribute__('i') * 2
+
+        @classmethod
+        def create(cls) -> 'SuperFoo':
+            return super().__new__(cls)
+
+    instance = SuperFoo(i=1)
+    assert not hasattr(instance, '__dict__')
+    assert get_errors(instance) is None
+    assert instance.double == 2
+    assert isinstance(SuperFoo.create(), SuperFoo)
+
+    instance = SuperFoo(i='1')
+    assert set(get_errors(instance).keys()) == {'i'}
+
+
+def test_fail_fast():
+    """
+        Тест режима "до первой ошибки": валидация останавливается на первом
+        невалидном поле, а ошибки не создаются.
+    """
+    nocorrect_input = copy.copy(correct_input)
+    nocorrect_input['s'] = 2
+    nocorrect_input['cc'] = 5
+    instance = Foo(**nocorrect_input)
+
+    # Режим можно включить для отдельного вызова is_valid()
+    assert not is_valid(instance, fail_fast=True)
+    assert get_errors(instance) == {'s': []}
+
+    # По умолчанию он выключен
+    assert not is_valid(instance)
+    assert set(get_errors(instance).keys()) == {'s', 'cc'}
+
+    # Режим можно включить для класса
+    @dataclass
+    class FailFastFoo(Foo):
+        _fail_fast__vdc = True
+
+    instance = FailFastFoo(**nocorrect_input)
+    assert get_errors(instance) == {'s': []}
+
+    # ... и выключить для отдельного вызова
+    assert not is_valid(instance, fail_fast=False)
+    assert set(get_errors(instance).keys()) == {'s', 'cc'}
+
+    instance = FailFastFoo(**correct_input)
+    assert get_errors(instance) is None
+
+
+def test_track_changes():
+    """
+        Тест повторной валидации только измененных полей.
+    """
+    @dataclass
+    class TrackedFoo(Foo):
+        _track_changes__vdc = True
+
+        def _is_field_valid__vdc(self, field, ctx):
+            checked.append(field.name)
+            return super()._is_field_valid__vdc(field, ctx)
+
+    checked = []
+    instance = TrackedFoo(**correct_input)
+    # Первая валидация - полная
+    assert checked == ['i', 's', 'l', 'cc']
+
+    # Ничего не менялось - ничего не проверяется
+    checked.clear()
+    assert is_valid(instance)
+    assert checked == []
+
+    instance.s = 1
+    instance.i = 2
+    assert not is_valid(instance)
+    assert checked == ['i', 's']
+    assert list(get_errors(instance)) == ['s']
+
+    # Поля с ошибками проверяются всегда
+    checked.clear()
+    instance.l = []
+    assert not is_valid(instance)
+    assert checked == ['s', 'l']
+    assert list(get_errors(instance)) == ['s']
+
+    instance.s = 's'
+    assert is_valid(instance)
+
+    # После остановки на первой ошибке следующая валидация - полная
+    instance.i = 'i'
+    assert not is_valid(instance, fail_fast=True)
+    checked.clear()
+    assert not is_valid(instance)
+    assert checked == ['i', 's', 'l', 'cc']
+
+    # У потомков отслеживание тоже включено
+    @dataclass
+    class SubTrackedFoo(TrackedFoo):
+        pass
+
+    instance = SubTrackedFoo(**correct_input)
+    checked.clear()
+    instance.i = 'i'
+    assert not is_valid(instance)
+    assert checked == ['i']
+    assert SubTrackedFoo.__setattr__ is TrackedFoo.__setattr__
+
+    # Без отслеживания множество изменений не создается
+    instance = Foo(**correct_input)
+    instance.i = 'i'
+    assert not hasattr(instance, '_changed__vdc')
+
+
+@pytest.mark.parametrize(
+    'flag', ['_track_changes__vdc', '_validate_assignment__vdc']
+)
+def test_setattr_hook_with_own_setattr(flag):
+    """
+        Тест отслеживания присваиваний и проверки при присваивании у
+        класса со своим __setattr__(): перехватчик оборачивает его.
+    """
+    assigned = []
+
+    def __setattr__(self, name, value):
+        assigned.append(name)
+        object.__setattr__(self, name, value)
+
+    OwnSetattrFoo = dataclass(type('OwnSetattrFoo', (BasicValidation, ), {
+        '__annotations__': {'i': int},
+        '__setattr__': __setattr__,
+        flag: True,
+    }))
+
+    instance = OwnSetattrFoo(i=1)
+    assert get_errors(instance) is None
+
+    instance.i = 'bad'
+    assert assigned == ['i', 'i']
+    assert not is_valid(instance)
+    assert set(get_errors(instance)) == {'i'}
@@ -1,10 +1,17 @@
 """
     Тесты класса InstanceValidation.
 """
+import json
+from dataclasses import FrozenInstanceError, dataclass, field, fields
+from typing import Optional
 
-from dataclasses import dataclass, fields
+import pytest
 
-from validated_dc import InstanceValidation
+from validated_dc import (
+    BasicValidationError, InstanceValidation, InstanceValidationError,
+    KeyValidationError, ValidatedDC, ValidationContext, get_errors,
+    get_payload_key, is_valid, serialize_errors
+)
 
 
 @dataclass
@@ -33,17 +40,19 @@ def test_is_instance_true():
     # У этого экземпляра есть поле bar с аннотацией Bar
     annotation = Bar
 
+    ctx = ValidationContext()
+
     # Тогда, проверка валидности поля со следующими значеними
     # должна вернуть True:
 
     value = {'foo': {'i': 1}}
-    assert instance._is_instance__vdc(value, annotation)
+    assert instance._is_instance__vdc(value, annotation, ctx)
 
     value = Bar(foo={'i': 1})
-    assert instance._is_instance__vdc(value, annotation)
+    assert instance._is_instance__vdc(value, annotation, ctx)
 
     value = Bar(foo=Foo(i=1))
-    assert instance._is_instance__vdc(value, annotation)
+    assert instance._is_instance__vdc(value, annotation, ctx)
 
 
 def test_is_instance_false():
@@ -62,23 +71,25 @@ def test_is_instance_false():
     # У этого экземпляра есть поле bar с аннотацией Bar
     annotation = Bar
 
+    ctx = ValidationContext()
+
     # Тогда, проверка валидности поля со следующими значеними
     # должна вернуть False:
 
     value = {'foo': {'i': '1'}}    # Неверный тип значение у вложенного поля i
-    assert not instance._is_instance__vdc(value, annotation)
+    assert not instance._is_instance__vdc(value, annotation, ctx)
 
     value = {'foo': {'i_x': 1}}    # Отсутствующее имя i_x в классе Foo
-    assert not instance._is_instance__vdc(value, annotation)
+    assert not instance._is_instance__vdc(value, annotation, ctx)
 
     value = Bar(foo={'i': [1, ]})  # Неверный тип значение у вложенного поля i
-    assert not instance._is_instance__vdc(value, annotation)
+    assert not instance._is_instance__vdc(value, annotation, ctx)
 
     value = Bar(foo=1)             # Неверный тип значение у поля foo
-    assert not instance._is_instance__vdc(value, annotation)
+    assert not instance._is_instance__vdc(value, annotation, ctx)
 
     value = {'foo_x': {'i': 1}}  # Отсутствующее имя foo_x в классе Bar
-    assert not instance._is_instance__vdc(value, annotation)
+    assert not instance._is_instance__vdc(value, annotation, ctx)
 
     # ... и т.п.
 
@@ -88,20 +99,17 @@ def test_init_validation():
         Тест инициализации свойст для валидации экземпляра.
     """
     # Для валидации экземпляра класса InstanceValidation, дополнительно к
-    # свойствам родителя, свойство self._replace инициализируется
-    # значением True.
+    # свойствам родителя, в контексте валидации свойство is_replace
+    # инициализируется значением True, а словарь замен - пустой.
 
     # Создадим произвольный экземпляр потомка InstanceValidation
     instance = Foo(i=1)
 
-    # Для теста, изменим значение поля на любое, отличное от True
-    instance._is_replace__vdc = False
-
     # Вызовем метод
-    instance._init_validation()
+    ctx = instance._init_validation()
 
-    # Значение у _replace должно вновь стать True
-    assert instance._is_replace__vdc
+    assert ctx.is_replace
+    assert ctx.replacements == {}
 
 
 def test_init_field_validation():
@@ -109,23 +117,24 @@ def test_init_field_validation():
         Тест инициализации свойст для валидации поля.
     """
     # Для валидации поля экземпляра класса InstanceValidation, дополнительно к
-    # свойствам родителя, свойство self._replacement__vdc инициализируется
+    # свойствам родителя, свойство ctx.replacement инициализируется
     # значением None.
 
     # Создадим произвольный экземпляр потомка InstanceValidation
     instance = Foo(i=1)
 
     # Для теста, изменим значение поля на любое, отличное от None
-    instance._replacement__vdc = 'data'
+    ctx = ValidationContext()
+    ctx.replacement = 'data'
 
     # Для вызова метода нужен экземпляр поля датакласса
     field = fields(instance)[0]
 
     # Вызовем метод
-    instance._init_field_validation(field)
+    instance._init_field_validation(field, ctx)
 
-    # Значение у _replacement должно вновь стать None
-    assert instance._replacement__vdc is None
+    # Значение у replacement должно вновь стать None
+    assert ctx.replacement is None
 
 
 def test_try_replacing_successfully():
@@ -142,20 +151,28 @@ def test_try_replacing_successfully():
     data = {'i': 2}
     instance.foo = data
 
-    # Для наглядности, присвоим полю self._replace значение True
+    ctx = instance._init_validation()
+    ctx.field_name = 'foo'
+
+    # Для наглядности, присвоим полю ctx.is_replace значение True
     # (это значение по умолчанию, но именно оно необходимо для возможности
     # произвести замену)
-    instance._is_replace__vdc = True  # Выполнять замену, если есть на что
+    ctx.is_replace = True  # Выполнять замену, если есть на что
 
-    # В поле self._replacement__vdc должен быть подготовленный экземпляр,
+    # В поле ctx.replacement должен быть подготовленный экземпляр,
     # который был получен из словаря
-    instance._replacement__vdc = Foo(**data)
+    ctx.replacement = Foo(**data)
 
     # Вызовем метод
-    instance._try_replacing()
+    instance._try_replacing(ctx)
 
-    # Должна произойти замена значения поля
-    assert instance.foo == instance._replacement__vdc
+    # Замена запланирована, но во время валидации экземпляр не изменяется
+    assert ctx.replacements == {'foo': ctx.replacement}
+    assert instance.foo == data
+
+    # Замена значения поля происходит при завершении валидации
+    instance._finish_validation(ctx)
+    assert instance.foo == ctx.replacement
 
 
 def test_try_replacing_unsuccessfully():
@@ -172,30 +189,32 @@ def test_try_replacing_unsuccessfully():
     data = {'i': 2}
     instance.foo = data
 
-    # 1. Присвоим полю self._replace значение False
-    instance._is_replace__vdc = False  # Не выполнять замену
+    ctx = instance._init_validation()
+    ctx.field_name = 'foo'
 
-    # В поле self._replacement__vdc должен быть подготовленный экземпляр,
+    # 1. Присвоим полю ctx.is_replace значение False
+    ctx.is_replace = False  # Не выполнять замену
+
+    # В поле ctx.replacement должен быть подготовленный экземпляр,
     # который был получен из словаря
-    instance._replacement__vdc = Foo(**data)  # Претендент на замену
+    ctx.replacement = Foo(**data)  # Претендент на замену
 
     # Вызовем метод
-    instance._try_replacing()
+    instance._try_replacing(ctx)
 
-    # Значения поля должно остаться прежним
-    assert instance.foo == data
-
-    # 2. Присвоим полю self._replace значение True
-    instance._is_replace__vdc = True  # Выполнять замену, если есть на что
+    # 2. Присвоим полю ctx.is_replace значение True
+    ctx.is_replace = True  # Выполнять замену, если есть на что
 
-    # Но в поле self._replacement__vdc поставим None (значение, которое оно
+    # Но в поле ctx.replacement поставим None (значение, которое оно
     # получает после инициализации перед валидацией поля)
-    instance._replacement__vdc = None  # Нет значения для замены
+    ctx.replacement = None  # Нет значения для замены
 
     # Вызовем метод
-    instance._try_replacing()
+    instance._try_replacing(ctx)
 
     # Значения поля должно остаться прежним
+    assert ctx.replacements == {}
+    instance._finish_validation(ctx)
     assert instance.foo == data
 
 
@@ -210,7 +229,7 @@ def test_is_field_valid():
     class FakeInstanceValidation(InstanceValidation):
         i: int
 
-        def _try_replacing(self) -> None:
+        def _try_replacing(self, ctx) -> None:
             self._try_replacing__called = True  # Маркер вызова
 
     # Создадим валидный экземпляр
@@ -223,7 +242,467 @@ def test_is_field_valid():
     field = fields(instance)[0]
 
     # Вызовем метод
-    instance._is_field_valid__vdc(field)
+    instance._is_field_valid__vdc(field, ValidationContext())
 
     # Метод _try_replacing() должен быть вызван
     assert instance._try_replacing__called
+
+
+def test_is_instance_without_copying():
+    """
+        Тест проверки уже созданного экземпляра: он перепроверяется на месте
+        и не заменяется копией.
+    """
+    foo = Foo(i=1)
+    instance = Bar(foo=foo)
+
+    assert instance.foo is foo
+    assert is_valid(instance)
+    assert instance.foo is foo
+
+    # Перепроверка на месте обнаруживает ошибки во вложенном экземпляре
+    foo.i = '1'
+    assert not is_valid(instance)
+    assert get_errors(foo)
+
+
+def test_trust_instances():
+    """
+        Тест флага _trust_instances__vdc: экземпляр, у которого не было
+        ошибок при последней валидации, не перепроверяется.
+    """
+    @dataclass
+    class TrustedBar(InstanceValidation):
+        foo: Foo
+
+        _trust_instances__vdc = True
+
+    foo = Foo(i=1)
+    instance = TrustedBar(foo=foo)
+    assert instance.foo is foo
+
+    # Изменение без перепроверки вложенного экземпляра не замечается
+    foo.i = '1'
+    assert is_valid(instance)
+
+    # А вот экземпляр с ошибками валидным не считается
+    assert not is_valid(foo)
+    assert not is_valid(instance)
+
+
+def test_validate_many():
+    """
+        Тест пакетной валидации validate_many().
+    """
+    foo = Foo(i=3)
+    items = [{'i': 1}, {'i': '2'}, foo, {'x': 1}, 5]
+
+    instances, errors = Foo.validate_many(iter(items))
+
+    # Валидные экземпляры в порядке следования во входных данных
+    assert instances == [Foo(i=1), foo]
+    assert instances[1] is foo
+
+    # Ошибки по индексам невалидных элементов
+    assert set(errors.keys()) == {1, 3, 4}
+    assert isinstance(errors[1][0], InstanceValidationError)
+    assert errors[1][0].errors
+    # Лишний ключ и отсутствующий обязательный - без исключения
+    assert errors[3][0].exception is None
+    assert errors[3][0].errors == {
+        'i': [KeyValidationError(
+            key_repr='i', key_type=str, annotation=int, missing=True
+        )],
+        'x': [KeyValidationError(
+            key_repr='x', key_type=str, annotation=None, missing=False
+        )],
+    }
+    assert type(errors[4][0]) is BasicValidationError
+
+    # Строки json - как в iter_validate()
+    instances, errors = Foo.validate_many(['{"i": 4}', '', '{'])
+    assert instances == [Foo(i=4)]
+    assert list(errors) == [2]
+
+    # Исключение TypeError не из-за ключей сохраняется в ошибке
+    @dataclass
+    class Bar(InstanceValidation):
+        i: int
+
+        def __post_init__(self) -> None:
+            raise TypeError('bar')
+
+    instances, errors = Bar.validate_many([{'i': 1}])
+    assert instances == []
+    assert errors[0][0].errors is None
+    assert str(errors[0][0].exception) == 'bar'
+
+
+def test_iter_validate():
+    """
+        Тест потоковой валидации iter_validate().
+    """
+    lines = ['{"i": 1}\n', b'{"i": "2"}', '\n', '{"i": 3', {'i': 4}]
+
+    results = Foo.iter_validate(iter(lines))
+
+    # Это генератор, результаты отдаются по одному
+    assert next(results) == (0, Foo(i=1))
+
+    index, errors = next(results)
+    assert index == 1
+    assert isinstance(errors[0], InstanceValidationError)
+
+    # Пустая строка пропускается, а строка с некорректным json дает ошибку
+    index, errors = next(results)
+    assert index == 3
+    assert isinstance(errors[0].exception, ValueError)
+
+    assert next(results) == (4, Foo(i=4))
+
+    assert list(results) == []
+
+
+def test_validate_parallel():
+    """
+        Тест пакетной валидации в пуле процессов validate_parallel().
+    """
+    items = [{'i': i} if i % 3 else {'i': str(i)} for i in range(10)]
+
+    instances, errors = Foo.validate_parallel(
+        items, max_workers=2, chunk_size=4
+    )
+
+    # Результаты в порядке следования элементов
+    assert instances == [Foo(i=i) for i in range(10) if i % 3]
+    assert sorted(errors.keys()) == [0, 3, 6, 9]
+
+    # Ошибки переданы между процессами в сериализованном виде
+    error = errors[3][0]
+    assert error['error'] == 'InstanceValidationError'
+    assert error['annotation'] == 'Foo'
+    assert error['errors']['i'][0]['value_type'] == 'str'
+
+
+def test_serialize_errors():
+    """
+        Тест перевода ошибок в сериализуемый вид.
+    """
+    instance = Bar(foo={'i_x': 1})
+    errors = serialize_errors(get_errors(instance))
+
+    assert errors == {'foo': [{
+        'error': 'InstanceValidationError',
+        'value_repr': "{'i_x': 1}",
+        'value_type': 'dict',
+        'annotation': 'Foo',
+        'exception': None,
+        'errors': {
+            'i': [{
+                'error': 'KeyValidationError', 'key_repr': 'i',
+                'key_type': 'str', 'annotation': 'int', 'missing': True,
+            }],
+            'i_x': [{
+                'error': 'KeyValidationError', 'key_repr': 'i_x',
+                'key_type': 'str', 'annotation': None, 'missing': False,
+            }],
+        },
+    }]}
+
+    # Результат можно сохранить в json
+    assert json.loads(json.dumps(errors)) == errors
+
+
+def test_instance_dict_without_validation_state():
+    """
+        Тест отсутствия промежуточного состояния валидации у экземпляра:
+        кроме полей у него есть только словарь ошибок (в слоте).
+    """
+    instance = Bar(foo={'i': 1})
+
+    assert set(vars(instance).keys()) == {'foo'}
+    assert instance._errors__vdc == {}
+
+
+def test_validate_dict():
+    """
+        Тест проверки словаря validate_dict() без создания экземпляров.
+    """
+    created = []
+
+    @dataclass
+    class Baz(InstanceValidation):
+        bar: Bar
+        s: str = 's'
+
+        def __post_init__(self):
+            created.append(self)
+            super().__post_init__()
+
+    assert Baz.validate_dict({'bar': {'foo': {'i': 1}}}) is None
+    assert Baz.validate_dict({'bar': Bar(Foo(1)), 's': '1'}) is None
+    assert created == []
+
+    errors = Baz.validate_dict({'bar': {'foo': {'i': '1'}}, 's': 1})
+    assert list(errors) == ['bar', 's']
+    error = errors['bar'][0]
+    assert isinstance(error, InstanceValidationError)
+    assert isinstance(error.errors['foo'][0], InstanceValidationError)
+    assert error.errors['foo'][0].errors['i'][0].value_repr == '1'
+    assert created == []
+
+    # Результат совпадает с ошибками при создании экземпляра
+    assert errors == get_errors(Baz(bar={'foo': {'i': '1'}}, s=1))
+    created.clear()
+
+    # Отсутствующие и лишние ключи
+    errors = Baz.validate_dict({'s': '1', 'x': 1, 'y': 2})
+    assert errors == {
+        'bar': [KeyValidationError(
+            key_repr='bar', key_type=str, annotation=Bar, missing=True
+        )],
+        'x': [KeyValidationError(
+            key_repr='x', key_type=str, annotation=None, missing=False
+        )],
+        'y': [KeyValidationError(
+            key_repr='y', key_type=str, annotation=None, missing=False
+        )],
+    }
+    errors = Baz.validate_dict({'bar': {}})
+    assert errors['bar'][0].errors['foo'][0].missing
+
+    # Режим "до первой ошибки"
+    data = {'bar': {'foo': {'i': '1'}}, 's': 1}
+    assert Baz.validate_dict(data, fail_fast=True) == {'bar': []}
+    errors = Baz.validate_dict({'s': 1, 'x': 1}, fail_fast=True)
+    assert list(errors) == ['bar', 'x']
+
+    assert created == []
+
+    with pytest.raises(TypeError):
+        Baz.validate_dict([1])
+
+
+def test_validate_assignment():
+    """
+        Тест проверки поля при присваивании ему значения.
+    """
+    @dataclass
+    class Baz(InstanceValidation):
+        _validate_assignment__vdc = True
+
+        foo: Foo
+        i: int = 0
+
+    instance = Baz(foo={'i': 1})
+    assert instance.foo == Foo(1)
+    assert get_errors(instance) is None
+
+    instance.i = 'i'
+    assert list(get_errors(instance)) == ['i']
+
+    # Словарь заменяется на экземпляр, ошибки других полей сохраняются
+    instance.foo = {'i': 2}
+    assert instance.foo == Foo(2)
+    assert list(get_errors(instance)) == ['i']
+
+    instance.foo = {'i': '2'}
+    assert list(get_errors(instance)) == ['i', 'foo']
+    assert instance.foo == {'i': '2'}
+
+    instance.i = 1
+    instance.foo = Foo(3)
+    assert get_errors(instance) is None
+
+    # Присваивание атрибуту, который не является полем
+    instance.x = 'x'
+    assert get_errors(instance) is None
+
+    # При создании экземпляра поля проверяются один раз, как обычно
+    instance = Baz(foo={'i': '1'}, i='i')
+    assert list(get_errors(instance)) == ['foo', 'i']
+
+
+def test_instance_cache():
+    """
+        Тест кэша результатов создания экземпляров из одинаковых словарей.
+    """
+    @dataclass
+    class Address(InstanceValidation):
+        _instance_cache_size__vdc = 2
+
+        city: str
+        zip_code: int = 0
+
+    @dataclass
+    class Person(InstanceValidation):
+        address: Address
+
+    first = Person(address={'city': 'A', 'zip_code': 1})
+    second = Person(address={'zip_code': 1, 'city': 'A'})
+    # Порядок ключей не важен, экземпляр один и тот же
+    assert second.address is first.address
+    assert Address.get_instance_cache_info() == {
+        'hits': 1, 'misses': 1, 'evictions': 0, 'maxsize': 2, 'currsize': 1
+    }
+
+    # Ошибки тоже кэшируются, а значения разных типов - разные ключи
+    assert get_errors(Person(address={'city': 1}))
+    assert get_errors(Person(address={'city': 1}))
+    assert not get_errors(Person(address={'city': 'A', 'zip_code': True}))
+    info = Address.get_instance_cache_info()
+    assert (info['hits'], info['misses'], info['evictions']) == (2, 3, 1)
+    assert info['currsize'] == 2
+
+    # Для значений не из json кэш не используется
+    Person(address={'city': 'A', 'zip_code': {1}})
+    assert Address.get_instance_cache_info()['misses'] == 3
+
+    Address.clear_instance_cache()
+    assert Address.get_instance_cache_info()['currsize'] == 0
+    assert get_payload_key({'a': [1, 2]}) == get_payload_key({'a': [1, 2]})
+    with pytest.raises(TypeError):
+        get_payload_key({'a': object()})
+
+    # Пользовательский ключ кэша
+    @dataclass
+    class City(InstanceValidation):
+        _instance_cache_size__vdc = 10
+        _instance_cache_key__vdc = staticmethod(lambda value: value['id'])
+
+        id: int
+        name: str
+
+    city = City._create_instance__vdc({'id': 1, 'name': 'A'})[0]
+    assert City._create_instance__vdc({'id': 1, 'name': 'B'})[0] is city
+
+    # Экземпляры общие, поэтому после создания доступны только для чтения
+    with pytest.raises(FrozenInstanceError):
+        city.name = 'C'
+    assert city.name == 'A'
+
+    assert Foo.get_instance_cache_info() is None
+
+
+@pytest.mark.parametrize(
+    'flag', ['_validate_assignment__vdc', '_track_changes__vdc']
+)
+def test_instance_cache_with_setattr_hook(flag):
+    """
+        Тест кэша экземпляров вместе с перехватом присваиваний: такие
+        настройки несовместимы, и класс не создается.
+    """
+    with pytest.raises(TypeError):
+        type('Child', (InstanceValidation, ), {
+            '_instance_cache_size__vdc': 2, flag: True,
+        })
+
+    # В том числе, если одна из настроек унаследована
+    Cached = type('Cached', (InstanceValidation, ), {
+        '_instance_cache_size__vdc': 2,
+    })
+    with pytest.raises(TypeError):
+        type('Child', (Cached, ), {flag: True})
+
+    Hooked = type('Hooked', (InstanceValidation, ), {flag: True})
+    with pytest.raises(TypeError):
+        type('Child', (Hooked, ), {'_instance_cache_size__vdc': 2})
+
+
+def test_instance_cache_read_only():
+    """
+        Тест кэша экземпляров: поля экземпляров класса с кэшем и его
+        потомков доступны только для чтения, даже если у класса есть
+        свой __setattr__().
+    """
+    def __setattr__(self, name, value):
+        object.__setattr__(self, name, value)
+
+    Child = dataclass(type('Child', (InstanceValidation, ), {
+        '__annotations__': {'a': int},
+        '__setattr__': __setattr__,
+        '_instance_cache_size__vdc': 2,
+    }))
+
+    @dataclass
+    class Parent(InstanceValidation):
+        c: Child
+
+    first = Parent({'a': 1})
+    second = Parent({'a': 1})
+    assert second.c is first.c
+
+    with pytest.raises(FrozenInstanceError):
+        first.c.a = 99
+    assert second.c.a == 1
+    assert get_errors(second) is None
+
+    # Потомок класса с кэшем тоже только для чтения
+    GrandChild = dataclass(type('GrandChild', (Child, ), {}))
+    with pytest.raises(FrozenInstanceError):
+        GrandChild(a=1).a = 2
+
+
+def test_instance_cache_containers():
+    """
+        Тест кэша экземпляров: экземпляры со значениями-контейнерами не
+        кэшируются, а изменения исходного словаря не попадают в кэш.
+    """
+    @dataclass
+    class Tags(InstanceValidation):
+        _instance_cache_size__vdc = 10
+
+        name: str
+        tags: list = field(default_factory=list)
+
+    @dataclass
+    class Post(InstanceValidation):
+        a: Tags
+
+    first = Post(a={'name': 'n', 'tags': ['x']})
+    second = Post(a={'name': 'n', 'tags': ['x']})
+    assert second.a is not first.a
+    first.a.tags.append('mut')
+    assert second.a.tags == ['x']
+
+    # Список из значения по умолчанию тоже был бы общим
+    first = Post(a={'name': 'n'})
+    second = Post(a={'name': 'n'})
+    assert second.a is not first.a
+    assert Tags.get_instance_cache_info()['currsize'] == 0
+
+    # Результат с ошибками кэшируется по копии словаря
+    payload = {'name': 1}
+    error = Tags._create_instance__vdc(payload)[1]
+    payload['name'] = 'changed'
+    assert Tags._create_instance__vdc({'name': 1})[1] is error
+    assert error.build().value_repr == "{'name': 1}"
+
+
+@pytest.mark.parametrize('base, annotation', [
+    (InstanceValidation, 'LateE'), (ValidatedDC, Optional['LateE']),
+])
+def test_late_declared_annotation(monkeypatch, base, annotation):
+    """
+        Тест аннотации-ссылки на класс, который объявлен после первого
+        использования класса с этой аннотацией.
+    """
+    LateD = dataclass(type('LateD', (base, ), {
+        '__annotations__': {'e': annotation},
+    }))
+
+    assert get_errors(LateD(e={'x': 1}))
+    assert '_field_types__vdc' not in LateD.__dict__
+    assert '_annotation_plans__vdc' not in LateD.__dict__
+
+    @dataclass
+    class LateE(InstanceValidation):
+        x: int
+
+    # Класс объявлен в модуле
+    monkeypatch.setitem(globals(), 'LateE', LateE)
+
+    instance = LateD(e={'x': 1})
+    assert get_errors(instance) is None
+    assert instance.e == LateE(x=1)
+    assert '_field_types__vdc' in LateD.__dict__
@@ -1,8 +1,12 @@
 """
     Тесты класса TypingValidation.
 """
+import sys
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional, Union
+from typing import (
+    Any, Callable, Dict, FrozenSet, List, Mapping, Optional, Sequence, Set,
+    Tuple, Union
+)
 try:
     from typing import Literal
 except Exception:  # pragma: no cover
@@ -10,7 +14,12 @@ except Exception:  # pragma: no cover
 
 import pytest
 
-from validated_dc import STR_ALIASES, TypingValidation
+from validated_dc import (
+    STR_ALIASES, BasicValidationError, DictValidationError,
+    ListValidationError, TypingValidation, ValidationContext, build_errors,
+    clear_annotation_cache, get_annotation_cache_info, get_errors,
+    get_literal_values, get_union_index
+)
 
 
 @dataclass
@@ -33,72 +42,80 @@ def instance():
     return Phone(phone='79991112233')
 
 
-def test_is_instance_true(instance):
+@pytest.fixture()
+def ctx():
+    """
+        Возвращает новый контекст валидации
+    """
+    return ValidationContext()
+
+
+def test_is_instance_true(instance, ctx):
     """
         Тест метода _is_instance() который вернет True
     """
     annotation = Any  # Возьмем любой поддерживаемый алиас
     value = 1
-    assert instance._is_instance__vdc(value, annotation)
+    assert instance._is_instance__vdc(value, annotation, ctx)
 
     annotation = Optional[int]  # и еще
     value = 1
-    assert instance._is_instance__vdc(value, annotation)
+    assert instance._is_instance__vdc(value, annotation, ctx)
 
     annotation = List[int]
     value = [1, ]
-    assert instance._is_instance__vdc(value, annotation)
+    assert instance._is_instance__vdc(value, annotation, ctx)
 
     annotation = List[Optional[int]]
     value = [1, None, ]
-    assert instance._is_instance__vdc(value, annotation)
+    assert instance._is_instance__vdc(value, annotation, ctx)
 
     annotation = List[Union[int, str, list]]
     value = [1, '2', [3, 4, ], ]
-    assert instance._is_instance__vdc(value, annotation)
+    assert instance._is_instance__vdc(value, annotation, ctx)
 
     # и т.д. и т.п...
     # Можно использовать любой поддерживаемый алиас в любой допустимой
     # комбинации c любым типом... Например и так:
     annotation = List[Union[int, str, Email]]
     value = [1, '2', Email(email='mail@mail.com'), ]
-    assert instance._is_instance__vdc(value, annotation)
+    assert instance._is_instance__vdc(value, annotation, ctx)
 
     # А так как TypingValidation наследник InstanceValidation, то можно вместо
     # него подставить словарь:
     value = [1, '2', {'email': 'mail@mail.com'}, ]
-    assert instance._is_instance__vdc(value, annotation)
+    assert instance._is_instance__vdc(value, annotation, ctx)
 
 
-def test_is_instance_false(instance):
+def test_is_instance_false(instance, ctx):
     """
         Тест метода _is_instance() который вернет False
     """
     annotation = List[int]
     value = ['1', ]  # Ошибка - str не int
-    assert not instance._is_instance__vdc(value, annotation)
+    assert not instance._is_instance__vdc(value, annotation, ctx)
 
     annotation = List[Optional[int]]
     value = ['1', None, ]  # Ошибка - str не int и не None
-    assert not instance._is_instance__vdc(value, annotation)
+    assert not instance._is_instance__vdc(value, annotation, ctx)
 
     annotation = List[Union[int, str, list]]
     value = [.1, '2', [3, 4, ], ]  # Ошибка - float не int не str и не list
-    assert not instance._is_instance__vdc(value, annotation)
+    assert not instance._is_instance__vdc(value, annotation, ctx)
 
     annotation = List[Union[int, str, Email]]
     value = [1, '2', Email(email=12345), ]  # Ошибка - int не str
-    assert not instance._is_instance__vdc(value, annotation)
+    assert not instance._is_instance__vdc(value, annotation, ctx)
 
     # Ошибки:
     # 1. Словарь не является допустимым типом в этом списке;
     # 2. Этот словарь нельзя использовать как входные данные для класса Email
     # так у Email нет поля с именем xxxx.
     value = [1, '2', {'xxxx': 'mail@mail.com'}, ]
-    assert not instance._is_instance__vdc(value, annotation)
+    assert not instance._is_instance__vdc(value, annotation, ctx)
 
 
-def test_is_instance_false_error_with_exception(instance):
+def test_is_instance_false_error_with_exception(instance, ctx):
     """
         Тест метода _is_instance() который вернет False, и в ошибке будет
         исключение.
@@ -107,16 +124,16 @@ def test_is_instance_false_error_with_exception(instance):
         записывает информацию о нем в ошибку.
     """
     # Убедимся что ошибок нет
-    assert not instance._field_errors__vdc
+    assert not ctx.field_errors
 
-    annotation = Dict['str', 'str']  # Возьмем любой НЕподдерживаемый алиас
+    annotation = Callable[[int], int]  # Любой НЕподдерживаемый алиас
     value = {'1': '2'}
     # И хоть значение соответствует аннотации,
     # метод _is_instance() должен вернуть False
-    assert not instance._is_instance__vdc(value, annotation)
+    assert not instance._is_instance__vdc(value, annotation, ctx)
     # ... а список ошибок должен пополниться одной ошибкой, которая,
     # в том числе, имеет и информацию об исключении
-    assert instance._field_errors__vdc[0].exception
+    assert ctx.field_errors[0].build().exception
 
 
 def test_is_typing_alias(instance):
@@ -125,15 +142,15 @@ def test_is_typing_alias(instance):
         аннотация - из модуля typing, и False если нет.
     """
     # Метод должен вернуть True
-    annotation = str(List[int])  # Поддерживаемый алиас из typing
+    annotation = List[int]  # Поддерживаемый алиас из typing
     assert instance._is_typing_alias(annotation)
-    annotation = str(Dict[int, int])  # НЕ поддерживаемый алиас из typing
+    annotation = Callable[[int], int]  # НЕ поддерживаемый алиас
     assert instance._is_typing_alias(annotation)
 
     # Метод должен вернуть False
-    annotation = str(int)
+    annotation = int
     assert not instance._is_typing_alias(annotation)
-    annotation = str(Email)
+    annotation = Email
     assert not instance._is_typing_alias(annotation)
 
 
@@ -143,115 +160,613 @@ def test_is_supported_alias(instance):
         аннотация из модуля typing поддерживается валидацией класса, и
         False если нет.
     """
-    for str_alias in STR_ALIASES.values():
-        assert instance._is_supported_alias(str_alias)
+    for alias in STR_ALIASES.keys():
+        assert instance._is_supported_alias(alias)
 
-    assert not instance._is_supported_alias(str(Dict[int, int]))
+    assert not instance._is_supported_alias(Callable[[int], int])
 
 
-def test_is_union_instance(instance):
+def test_is_union_instance(instance, ctx):
     """
         Тест метода _is_union_instance() который возвращает True если
         значение имеет тип одного из типов кортежа Union, и False если нет.
     """
     annotation = Optional[int]
     value = 1
-    assert instance._is_union_instance(value, annotation)
+    assert instance._is_union_instance(value, annotation, ctx)
     value = None
-    assert instance._is_union_instance(value, annotation)
+    assert instance._is_union_instance(value, annotation, ctx)
     value = 0.3  # Ошибка - float не int и не None
-    assert not instance._is_union_instance(value, annotation)
+    assert not instance._is_union_instance(value, annotation, ctx)
 
     annotation = Union[int, str]
     value = 1
-    assert instance._is_union_instance(value, annotation)
+    assert instance._is_union_instance(value, annotation, ctx)
     value = '2'
-    assert instance._is_union_instance(value, annotation)
+    assert instance._is_union_instance(value, annotation, ctx)
     value = 0.3  # Ошибка - float не int и не  str
-    assert not instance._is_union_instance(value, annotation)
+    assert not instance._is_union_instance(value, annotation, ctx)
 
     # Union так же может иметь вложенные поддерживаемые алиасы из typing
     annotation = Union[List[int], str]
     value = [1, 2, ]
-    assert instance._is_union_instance(value, annotation)
+    assert instance._is_union_instance(value, annotation, ctx)
     value = '1'
-    assert instance._is_union_instance(value, annotation)
+    assert instance._is_union_instance(value, annotation, ctx)
     value = [1, '2', ]   # Ошибка - элемент списка может быть только int
-    assert not instance._is_union_instance(value, annotation)
+    assert not instance._is_union_instance(value, annotation, ctx)
 
     # Union сам может быть вложенныи в другой поддерживаемый алиас из typing
     annotation = Union[List[Union[int, str]], str]
     value = [1, '2', ]
-    assert instance._is_union_instance(value, annotation)
+    assert instance._is_union_instance(value, annotation, ctx)
     value = '1'
-    assert instance._is_union_instance(value, annotation)
+    assert instance._is_union_instance(value, annotation, ctx)
     value = [1, '2', 0.3]  # Ошибка - элемент списка может быть int или str
-    assert not instance._is_union_instance(value, annotation)
+    assert not instance._is_union_instance(value, annotation, ctx)
 
     # Так как TypingValidation наследник InstanceValidation, то следующий
     # вызов так же вернет True
     annotation = Union[List[Union[int, Email]], str]
     value = [1, {'email': 'mail@mail.com'}, 2, Email(email='mail2@mail.com')]
-    assert instance._is_union_instance(value, annotation)
+    assert instance._is_union_instance(value, annotation, ctx)
 
     # а здесь - вернет False т.к. поля xxxx нет в классе Email
     value = [1, {'xxxx': 'mail@mail.com'}, 2, Email(email='mail2@mail.com')]
-    assert not instance._is_union_instance(value, annotation)
+    assert not instance._is_union_instance(value, annotation, ctx)
     # и здесь - вернет False т.к. email должен быть строкой
     value = [1, {'email': 12345}, 2, Email(email='mail2@mail.com')]
-    assert not instance._is_union_instance(value, annotation)
+    assert not instance._is_union_instance(value, annotation, ctx)
     value = [1, {'email': 'mail@mail.com'}, 2, Email(email=12345)]
-    assert not instance._is_union_instance(value, annotation)
+    assert not instance._is_union_instance(value, annotation, ctx)
 
 
-def test_is_list_instance(instance):
+def test_is_list_instance(instance, ctx):
     """
         Тест метода _is_list_instance() который возвращает True если
         все элементы списка имеет тип указанный в List, и False если нет.
     """
     annotation = List[int]
     value = [1, 2, ]
-    assert instance._is_list_instance(value, annotation)
+    assert instance._is_list_instance(value, annotation, ctx)
     value = [1, '2', ]
-    assert not instance._is_list_instance(value, annotation)
+    assert not instance._is_list_instance(value, annotation, ctx)
     value = 1
-    assert not instance._is_list_instance(value, annotation)
+    assert not instance._is_list_instance(value, annotation, ctx)
 
     annotation = List[List[int]]
     value = [[1, 2, ], [3, 4, ]]
-    assert instance._is_list_instance(value, annotation)
+    assert instance._is_list_instance(value, annotation, ctx)
     value = [[1, 2, ], [3, '4', ]]
-    assert not instance._is_list_instance(value, annotation)
+    assert not instance._is_list_instance(value, annotation, ctx)
+
+
+def test_is_simple_list_instance(instance, ctx):
+    """
+        Тест проверки списка элементов простого типа: проверяются только
+        типы элементов, а список не копируется.
+    """
+    annotation = List[float]
+    value = [float(i) for i in range(10**5)]
+    assert instance._is_list_instance(value, annotation, ctx)
+    assert ctx.replacement is None
+
+    # Потомки типа тоже подходят
+    assert instance._is_list_instance([1, True], List[int], ctx)
+
+    # Ошибка указывает на первый невалидный элемент
+    value[500] = '1'
+    value[700] = None
+    assert not instance._is_instance__vdc(value, annotation, ctx)
+    errors = build_errors(ctx.field_errors)
+    assert errors[0].value_repr == '1'
+    assert errors[-1].item_index == 500
+
+
+def test_list_instance_without_copying(instance, ctx):
+    """
+        Тест того, что список копируется только при замене элемента-словаря
+        на экземпляр, начиная с первого замененного элемента.
+    """
+    annotation = List[Phone]
+    phones = [Phone('1', 'home'), Phone('2')]
+
+    # Все элементы уже экземпляры - заменять нечего
+    assert instance._is_list_instance(phones, annotation, ctx)
+    assert ctx.replacement is None
+
+    value = phones + [{'phone': '3', 'kind': 'home'}, phones[0]]
+    assert instance._is_list_instance(value, annotation, ctx)
+    assert ctx.replacement is not value
+    assert ctx.replacement[:2] == phones
+    assert ctx.replacement[2] == Phone('3', 'home')
+    assert ctx.replacement[3] is phones[0]
+    # Исходный список не изменился
+    assert value[2] == {'phone': '3', 'kind': 'home'}
+
+    annotation = List[List[Phone]]
+    assert instance._is_list_instance([phones, phones], annotation, ctx)
+    assert ctx.replacement is None
 
 
-def test_is_literal_instance(instance):
+def test_is_dict_instance(instance, ctx):
+    """
+        Тест валидации на алиасы Dict и Mapping.
+    """
+    annotation = Dict[str, int]
+    value = {str(i): i for i in range(10**4)}
+    assert instance._is_instance__vdc(value, annotation, ctx)
+    assert ctx.replacement is None
+
+    assert instance._is_instance__vdc({}, Dict[str, Any], ctx)
+    assert not instance._is_instance__vdc([], annotation, ctx)
+
+    # Невалидный ключ
+    assert not instance._is_instance__vdc({1: 1}, annotation, ctx)
+    errors = build_errors(ctx.field_errors)
+    assert errors[-1] == DictValidationError(
+        key_repr='1', key_type=int, annotation=str, is_key=True
+    )
+
+    # Невалидное значение
+    ctx = ValidationContext()
+    assert not instance._is_instance__vdc({'a': '1'}, annotation, ctx)
+    errors = build_errors(ctx.field_errors)
+    assert errors[-1] == DictValidationError(
+        key_repr='a', key_type=str, annotation=int, is_key=False
+    )
+
+    # Значения-словари заменяются на экземпляры в новом словаре
+    annotation = Dict[str, Phone]
+    phone = Phone('1')
+    value = {'a': phone, 'b': {'phone': '2'}}
+    assert instance._is_instance__vdc(value, annotation, ctx)
+    assert ctx.replacement == {'a': phone, 'b': Phone('2')}
+    assert ctx.replacement['a'] is phone
+    assert value['b'] == {'phone': '2'}
+
+    annotation = Mapping[str, List[int]]
+    assert instance._is_instance__vdc({'a': [1, 2]}, annotation, ctx)
+    assert not instance._is_instance__vdc({'a': [1, '2']}, annotation, ctx)
+
+
+def test_is_tuple_instance(instance, ctx):
+    """
+        Тест валидации на алиас Tuple.
+    """
+    assert instance._is_instance__vdc((1, 2, 3), Tuple[int, ...], ctx)
+    assert instance._is_instance__vdc((), Tuple[int, ...], ctx)
+    assert not instance._is_instance__vdc([1], Tuple[int, ...], ctx)
+    assert not instance._is_instance__vdc((1, '2'), Tuple[int, ...], ctx)
+
+    annotation = Tuple[int, str]
+    assert instance._is_instance__vdc((1, '2'), annotation, ctx)
+    assert instance._is_instance__vdc((), Tuple[()], ctx)
+    assert not instance._is_instance__vdc(('1', '2'), annotation, ctx)
+
+    # Длина кортежа не совпадает с аннотацией
+    ctx = ValidationContext()
+    assert not instance._is_instance__vdc((1, '2', 3), annotation, ctx)
+    error = ctx.field_errors[0].build()
+    assert isinstance(error.exception, ValueError)
+
+    annotation = Tuple[int, Phone]
+    value = (1, {'phone': '2'})
+    assert instance._is_instance__vdc(value, annotation, ctx)
+    assert ctx.replacement == (1, Phone('2'))
+
+    value = ({'phone': '1'}, {'phone': '2'})
+    assert instance._is_instance__vdc(value, Tuple[Phone, ...], ctx)
+    assert ctx.replacement == (Phone('1'), Phone('2'))
+
+
+def test_is_set_instance(instance, ctx):
+    """
+        Тест валидации на алиасы Set и FrozenSet.
+    """
+    assert instance._is_instance__vdc({1, 2}, Set[int], ctx)
+    assert not instance._is_instance__vdc({1, '2'}, Set[int], ctx)
+    assert not instance._is_instance__vdc([1, 2], Set[int], ctx)
+    assert not instance._is_instance__vdc({1, 2}, FrozenSet[int], ctx)
+    assert instance._is_instance__vdc(frozenset({1}), FrozenSet[int], ctx)
+    assert instance._is_instance__vdc(
+        {(1, '1')}, Set[Tuple[int, str]], ctx
+    )
+
+
+def test_is_sequence_instance(instance, ctx):
+    """
+        Тест валидации на алиас Sequence.
+    """
+    annotation = Sequence[int]
+    assert instance._is_instance__vdc([1, 2], annotation, ctx)
+    assert instance._is_instance__vdc((1, 2), annotation, ctx)
+    assert instance._is_instance__vdc(range(3), annotation, ctx)
+    assert not instance._is_instance__vdc({1, 2}, annotation, ctx)
+    assert not instance._is_instance__vdc([1, '2'], annotation, ctx)
+
+    annotation = Sequence[Phone]
+    assert instance._is_instance__vdc(({'phone': '1'}, ), annotation, ctx)
+    assert ctx.replacement == (Phone('1'), )
+
+
+def test_collection_fields():
+    """
+        Тест экземпляра с полями-коллекциями.
+    """
+    @dataclass
+    class Book(TypingValidation):
+        phones: Dict[str, Phone]
+        tags: FrozenSet[str]
+        pair: Tuple[int, Optional[Email]]
+
+    book = Book(
+        phones={'home': {'phone': '1', 'kind': 'home'}},
+        tags=frozenset({'a'}), pair=(1, {'email': 'a@a.com'})
+    )
+    assert not book.get_errors()
+    assert book.phones == {'home': Phone('1', 'home')}
+    assert book.pair == (1, Email('a@a.com'))
+
+    book = Book(phones={'home': {'phone': 1}}, tags=frozenset(), pair=(1,))
+    errors = book.get_errors()
+    assert list(errors) == ['phones', 'pair']
+    assert isinstance(errors['phones'][-1], DictValidationError)
+
+
+def test_is_literal_instance(instance, ctx):
     """
         Тест метода _is_literal_instance() который возвращает True если
         значение присутствует в кортеже Literal, и False если нет.
     """
     annotation = Literal[1, 2]
     value = 1
-    assert instance._is_literal_instance(value, annotation)
+    assert instance._is_literal_instance(value, annotation, ctx)
     value = 2
-    assert instance._is_literal_instance(value, annotation)
+    assert instance._is_literal_instance(value, annotation, ctx)
     value = '2'
-    assert not instance._is_literal_instance(value, annotation)
+    assert not instance._is_literal_instance(value, annotation, ctx)
     value = 3
-    assert not instance._is_literal_instance(value, annotation)
-
-
-def test_is_any_instance(instance):
+    assert not instance._is_literal_instance(value, annotation, ctx)
+
+    # bool не путается с int
+    annotation = Literal[1, 0]
+    assert instance._is_literal_instance(1, annotation, ctx)
+    assert not instance._is_literal_instance(True, annotation, ctx)
+    assert not instance._is_literal_instance(False, annotation, ctx)
+    annotation = Literal[True]
+    assert instance._is_literal_instance(True, annotation, ctx)
+    assert not instance._is_literal_instance(1, annotation, ctx)
+
+    # Нехешируемые значения
+    annotation = Literal[[1, 2], 'a']
+    assert instance._is_literal_instance([1, 2], annotation, ctx)
+    assert instance._is_literal_instance('a', annotation, ctx)
+    assert not instance._is_literal_instance([1], annotation, ctx)
+    assert not instance._is_literal_instance({}, Literal[1, 2], ctx)
+
+    # В ошибке указаны допустимые значения
+    ctx.typing_field_error = None
+    annotation = Literal[tuple(range(500))]
+    assert instance._is_literal_instance(499, annotation, ctx)
+    assert not instance._is_literal_instance(500, annotation, ctx)
+    error = ctx.typing_field_error.build()
+    assert error.literal_values == tuple(range(500))
+    assert get_literal_values(annotation).values == tuple(range(500))
+
+
+def test_is_any_instance(instance, ctx):
     """
         Тест метода _is_any_instance() который возвращает True всегда
     """
     annotation = Any
     value = 1
-    assert instance._is_any_instance(value, annotation)
+    assert instance._is_any_instance(value, annotation, ctx)
     value = '1'
-    assert instance._is_any_instance(value, annotation)
+    assert instance._is_any_instance(value, annotation, ctx)
     value = Email
-    assert instance._is_any_instance(value, annotation)
+    assert instance._is_any_instance(value, annotation, ctx)
     value = True
-    assert instance._is_any_instance(value, annotation)
+    assert instance._is_any_instance(value, annotation, ctx)
     value = int
-    assert instance._is_any_instance(value, annotation)
+    assert instance._is_any_instance(value, annotation, ctx)
+
+
+def test_get_alias_info(instance):
+    """
+        Тест метода _get_alias_info__vdc(), который возвращает кортеж
+        (является ли аннотация алиасом, имя метода для ее проверки).
+    """
+    assert instance._get_alias_info__vdc(List[int]) == (
+        True, '_is_list_instance'
+    )
+    assert instance._get_alias_info__vdc(Optional[int]) == (
+        True, '_is_union_instance'
+    )
+    assert instance._get_alias_info__vdc(Callable[[], int]) == (
+        True, None
+    )
+    assert instance._get_alias_info__vdc(int) == (False, None)
+    assert instance._get_alias_info__vdc(Email) == (False, None)
+    assert instance._get_alias_info__vdc(Any) == (True, '_is_any_instance')
+    # Алиас без параметров
+    assert instance._get_alias_info__vdc(List) == (True, '_is_list_instance')
+    assert instance._is_instance__vdc([1, '2'], List, ValidationContext())
+
+
+@pytest.mark.skipif(
+    sys.version_info < (3, 10), reason='list[int] и int | None - с 3.10'
+)
+def test_builtin_generic_annotations(instance, ctx):
+    """
+        Тест аннотаций вида list[int] (PEP 585) и int | None (PEP 604).
+    """
+    assert instance._get_alias_info__vdc(list[int]) == (
+        True, '_is_list_instance'
+    )
+    assert instance._get_alias_info__vdc(int | None) == (
+        True, '_is_union_instance'
+    )
+
+    @dataclass
+    class Book(TypingValidation):
+        pages: list[int]
+        phones: dict[str, Phone]
+        email: Email | None = None
+
+    book = Book(pages=[1, 2], phones={'a': {'phone': '1'}})
+    assert not book.get_errors()
+    assert book.phones == {'a': Phone('1')}
+
+    book = Book(pages=[1, '2'], phones={}, email={'email': 1})
+    errors = book.get_errors()
+    assert list(errors) == ['pages', 'email']
+    # Ошибки - результат проверки, а не исключение у isinstance()
+    assert errors['pages'][-1] == ListValidationError(
+        item_index=1, item_repr='2', item_type=str, annotation=int
+    )
+
+    assert instance._is_instance__vdc(None, int | None, ctx)
+    assert not instance._is_instance__vdc('1', int | None, ctx)
+
+
+def test_recursive_annotations():
+    """
+        Тест класса, который ссылается сам на себя через строковую
+        аннотацию.
+    """
+    @dataclass
+    class Node(TypingValidation):
+        value: int
+        children: List['Node']
+        parent: Optional['Node'] = None
+
+    data = {'value': 1, 'children': [
+        {'value': 2, 'children': [{'value': 3, 'children': []}]},
+    ]}
+    node = Node(**data)
+    assert not node.get_errors()
+    assert node.children[0].children[0] == Node(3, [])
+
+    data['children'][0]['children'][0]['value'] = '3'
+    node = Node(**data)
+    errors = node.get_errors()
+    assert list(errors) == ['children']
+
+
+def test_annotation_cache():
+    """
+        Тест кэша разобранных аннотаций.
+    """
+    clear_annotation_cache()
+    info = get_annotation_cache_info()
+    assert info['hits'] == info['misses'] == info['currsize'] == 0
+
+    annotation = List[Union[int, str]]
+    assert TypingValidation._get_alias_info__vdc(annotation) == (
+        True, '_is_list_instance'
+    )
+    assert TypingValidation._get_alias_info__vdc(annotation) == (
+        True, '_is_list_instance'
+    )
+    info = get_annotation_cache_info()
+    assert info['misses'] == 1
+    assert info['hits'] == 1
+
+    # Нехешируемая аннотация тоже кэшируется (по id)
+    annotation = Literal[[1, 2]]
+    assert TypingValidation._get_alias_info__vdc(annotation) == (
+        True, '_is_literal_instance'
+    )
+    assert TypingValidation._get_alias_info__vdc(annotation) == (
+        True, '_is_literal_instance'
+    )
+    info = get_annotation_cache_info()
+    assert info['unhashable_currsize'] == 1
+    assert info['hits'] == 2
+
+    clear_annotation_cache()
+    info = get_annotation_cache_info()
+    assert info['currsize'] == info['unhashable_currsize'] == 0
+
+
+def test_annotation_plans():
+    """
+        Тест разобранных аннотаций полей, которые хранятся в классе: при
+        валидации общий кэш аннотаций не используется.
+    """
+    @dataclass
+    class Contacts(TypingValidation):
+        contacts: List[Union[Phone, Email]]
+        kinds: Dict[str, Literal['a', 'b']]
+        tags: Optional[Set[int]] = None
+
+    assert get_errors(Contacts([{'phone': '1'}], {'x': 'a'})) is None
+
+    plans = Contacts._get_annotation_plans__vdc()
+    annotation = Contacts.__dataclass_fields__['contacts'].type
+    plan = plans[id(annotation)]
+    assert plan.annotation is annotation
+    assert plan.method_name == '_is_list_instance'
+    assert plans[id(plan.item_annotation)].union_index is not None
+
+    clear_annotation_cache()
+
+    instance = Contacts(
+        [{'phone': '1'}, {'email': '2'}], {'x': 'a', 'y': 'b'}, {1}
+    )
+    assert get_errors(instance) is None
+    instance = Contacts([{'phone': 1}], {'x': 'c'}, {'1'})
+    assert set(get_errors(instance)) == {'contacts', 'kinds', 'tags'}
+
+    info = get_annotation_cache_info()
+    assert info['hits'] == info['misses'] == info['currsize'] == 0
+
+
+def test_union_errors_are_discarded(instance, ctx):
+    """
+        Тест отбрасывания ошибок неподошедших типов Union, если один из
+        типов подошел.
+    """
+    annotation = List[Union[int, str]]
+    value = ['1', '2', 3]
+    assert instance._is_instance__vdc(value, annotation, ctx)
+    assert ctx.field_errors == []
+
+    # Если же подходящего типа нет, то ошибки остаются
+    value = ['1', 0.2]
+    assert not instance._is_instance__vdc(value, annotation, ctx)
+    errors = build_errors(ctx.field_errors)
+    assert [type(error) for error in errors] == [
+        BasicValidationError, BasicValidationError, ListValidationError
+    ]
+    assert errors[2].item_index == 1
+
+
+def test_fail_fast(instance):
+    """
+        Тест режима "до первой ошибки" для алиасов: ошибки не создаются.
+    """
+    ctx = ValidationContext()
+    ctx.fail_fast = True
+
+    annotation = List[Union[int, Literal['a']]]
+    value = [1, 'a', 'b', 0.3]
+    assert not instance._is_instance__vdc(value, annotation, ctx)
+    assert ctx.field_errors == []
+    assert ctx.typing_field_error is None
+
+
+def test_union_without_type_error():
+    """
+        Тест Union с классом, которому не подходят ключи словаря: ключи
+        проверяются заранее, и исключение TypeError от __init__() не
+        возникает.
+    """
+    @dataclass
+    class Contact(TypingValidation):
+        contact: Union[Phone, int, str]
+
+    exceptions = []
+
+    def trace(frame, event, arg):
+        if event == 'exception' and issubclass(arg[0], TypeError):
+            exceptions.append(arg[1])
+        return trace
+
+    previous_trace = sys.gettrace()
+    sys.settrace(trace)
+    try:
+        instance = Contact(contact={'email': 'x'})
+    finally:
+        sys.settrace(previous_trace)
+
+    assert exceptions == []
+    assert set(get_errors(instance)) == {'contact'}
+
+
+def test_union_index(instance, ctx):
+    """
+        Тест выбора класса из Union по словарю без создания экземпляров всех
+        классов по очереди.
+    """
+    annotation = Union[Phone, Email, List[Union[Phone, Email]]]
+
+    # Ключ email есть только у класса Email
+    union_index = get_union_index(annotation)
+    assert union_index.get_class({'email': 'mail@mail.com'}) is Email
+    assert union_index.get_class({'phone': '123', 'kind': 'home'}) is Phone
+    # По общему ключу или по ключам разных классов выбрать класс нельзя
+    assert union_index.get_class({'kind': 'home'}) is None
+    assert union_index.get_class({'phone': '1', 'email': '2'}) is None
+
+    assert instance._is_instance__vdc(
+        {'email': 'mail@mail.com'}, annotation, ctx
+    )
+    assert isinstance(ctx.replacement, Email)
+
+    # Экземпляр Phone даже не пытались создать, поэтому ошибок от него нет
+    assert not instance._is_instance__vdc({'email': 1}, annotation, ctx)
+    errors = build_errors(ctx.field_errors)
+    assert [error.annotation for error in errors] == [
+        Email, List[Union[Phone, Email]]
+    ]
+
+    # Для Union без нескольких классов индекс не нужен
+    assert get_union_index(Union[Phone, int]) is None
+
+
+def test_union_index_by_tag(instance, ctx):
+    """
+        Тест выбора класса из Union по значению поля-тега.
+    """
+    @dataclass
+    class Cat(TypingValidation):
+        name: str
+        type: Literal['cat'] = 'cat'
+
+        _discriminator__vdc = 'type'
+
+    @dataclass
+    class Dog(TypingValidation):
+        name: str
+        type: Literal['dog', 'puppy'] = 'dog'
+
+        _discriminator__vdc = 'type'
+
+    annotation = Union[Cat, Dog]
+    union_index = get_union_index(annotation)
+    assert union_index.tag_name == 'type'
+    assert union_index.get_class({'name': 'Rex', 'type': 'puppy'}) is Dog
+    assert union_index.get_class({'name': 'Tom', 'type': 'cat'}) is Cat
+
+    assert instance._is_instance__vdc({'name': 'Rex'}, annotation, ctx)
+    assert isinstance(ctx.replacement, Cat)
+    assert instance._is_instance__vdc(
+        {'name': 'Rex', 'type': 'dog'}, annotation, ctx
+    )
+    assert isinstance(ctx.replacement, Dog)
+
+
+def test_validate_dict():
+    """
+        Тест проверки словаря с вложенными коллекциями без создания
+        экземпляров.
+    """
+    @dataclass
+    class Book(TypingValidation):
+        contacts: List[Union[Phone, Email]]
+        phones: Dict[str, Phone]
+
+    data = {
+        'contacts': [{'phone': '1'}, {'email': 'a@a.com'}],
+        'phones': {'home': {'phone': '2', 'kind': 'home'}},
+    }
+    assert Book.validate_dict(data) is None
+    # Исходный словарь не изменился
+    assert data['contacts'][0] == {'phone': '1'}
+
+    data['phones']['home']['kind'] = 'work'
+    errors = Book.validate_dict(data)
+    assert list(errors) == ['phones']
+    assert errors == get_errors(Book(**data))
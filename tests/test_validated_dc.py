@@ -5,7 +5,7 @@ try:
 except Exception:  # pragma: no cover
     from typing_extensions import Literal
 
-from validated_dc import ValidatedDC
+from validated_dc import ValidatedDC, ValidationProfiler
 
 
 @dataclass
@@ -39,6 +39,17 @@ class Workers(ValidatedDC):
     person: Union[Person, List[Person]]
 
 
+@dataclass
+class Department(ValidatedDC):
+    name: str
+    staff: List['Employee'] = None
+
+
+@dataclass
+class Employee(ValidatedDC):
+    department: Department
+
+
 def test_get_nested_validated_dc():
     """
         Тест метода-класса get_nested_validated_dc().
@@ -50,3 +61,79 @@ def test_get_nested_validated_dc():
     ))
 
     assert Workers.get_nested_validated_dc() == nested_validated_dc
+
+
+def test_get_nested_validated_dc_order():
+    """
+        Тест метода-класса get_nested_validated_dc_order().
+        Он должен вернуть вложенные классы в порядке зависимостей и
+        сохранить результат в классе.
+    """
+    order = Workers.get_nested_validated_dc_order()
+    assert set(order) == Workers.get_nested_validated_dc()
+    # Person использует все остальные классы, поэтому идет последним
+    assert order[-1] is Person
+    assert Workers.get_nested_validated_dc_order() is order
+
+    assert Phone.get_nested_validated_dc_order() == ()
+
+
+def test_get_nested_validated_dc_cycles():
+    """
+        Тест вложенных классов, которые ссылаются сами на себя или друг на
+        друга.
+    """
+    @dataclass
+    class Node(ValidatedDC):
+        children: List['Node']
+        address: Optional[Address] = None
+
+    assert Node.get_nested_validated_dc_order() == (Address, Node)
+
+    # Классы, которые ссылаются друг на друга
+    assert Employee.get_nested_validated_dc() == {Department, Employee}
+    assert Employee.get_nested_validated_dc_order() == (Employee, Department)
+    assert Department.get_nested_validated_dc_order() == (
+        Department, Employee
+    )
+
+
+def test_validation_profiler():
+    """
+        Тест сбора статистики валидации по классам, полям и видам
+        аннотаций.
+    """
+    data = {
+        'name': 'Peter', 'age': 30,
+        'contact': [{'phone': '1'}, {'email': 'a@a.com'}],
+        'address': {'city': 'Moscow'},
+    }
+
+    with ValidationProfiler() as profiler:
+        Workers(person=[data])
+        Person.validate_dict(data)
+
+    # После выхода из блока статистика не собирается
+    Workers(person=data)
+
+    stats = profiler.to_dict()
+    assert set(stats) == {'classes', 'fields', 'annotations'}
+    assert stats['classes']['Workers']['count'] == 1
+    assert stats['classes']['Person']['count'] == 1
+    assert stats['classes']['Address']['count'] == 1
+    assert stats['fields']['Person.contact']['count'] == 2
+    assert stats['fields']['Workers.person']['time'] > 0
+    annotations = stats['annotations']
+    assert annotations['nested_instance']['count'] == 4
+    assert annotations['nested_dict']['count'] == 3
+    assert annotations['list']['count'] == 3
+    assert annotations['literal']['count'] == 2
+
+    profiler.reset()
+    assert profiler.to_dict()['classes'] == {}
+
+    # Профилировщик можно включать и выключать методами
+    profiler.start()
+    Address(city='Moscow')
+    profiler.stop()
+    assert profiler.to_dict()['classes']['Address']['count'] == 1
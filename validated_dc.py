@@ -15,7 +15,8 @@
     @dataclass
     class TypingValidation(InstanceValidation):
         Добавляет для использования в аннотациях некоторые алиасы из модуля
-        typing, на данный момент это: List, Union, Optional, Any и Literal.
+        typing, на данный момент это: List, Union, Optional, Any, Literal,
+        Dict, Mapping, Tuple, Set, FrozenSet и Sequence.
 
     @dataclass
     class InstanceValidation(BasicValidation):
@@ -35,18 +36,49 @@
         Для аннотаций полей можно использовать стандартные типы Python и
         классы созданные пользователем.
 """
-import copy
+import collections.abc
+import inspect
+import json
 import logging
+import sys
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import Field as DataclassesField
-from dataclasses import asdict, dataclass
+from dataclasses import (
+    MISSING, FrozenInstanceError, dataclass, is_dataclass
+)
 from dataclasses import fields as dataclasses_fields
-from typing import Any, Callable, List, Optional, Union, Sequence
+from functools import lru_cache
+from itertools import islice
+from time import perf_counter
+from typing import (
+    Any, Callable, Dict, ForwardRef, FrozenSet, Iterable, Iterator, List,
+    Mapping, Optional, Sequence, Set, Tuple, Union, get_type_hints
+)
 
 try:
     from typing import Literal
 except Exception:  # pragma: no cover
     from typing_extensions import Literal
 
+try:
+    from typing import get_args, get_origin
+except ImportError:  # pragma: no cover
+    # Python 3.7
+    def get_origin(annotation: Any) -> Any:
+        return getattr(annotation, '__origin__', None)
+
+    def get_args(annotation: Any) -> tuple:
+        if getattr(annotation, '_special', False):
+            return ()
+        return getattr(annotation, '__args__', ())
+
+try:
+    from types import UnionType  # Аннотации вида int | None
+except ImportError:  # pragma: no cover
+    UnionType = None
+
 
 logger = logging.getLogger()
 
@@ -62,17 +94,332 @@ class BasicValidationError:
 MAX_REPR = 30  # Максимальная длина строкового представления
 
 
+# Скобки строковых представлений контейнеров, для которых начало
+# представления можно получить, не вычисляя его целиком
+CONTAINER_BRACKETS = {list: ('[', ']'), tuple: ('(', ')'), dict: ('{', '}')}
+
+
+def _get_repr_prefix(value: Any, limit: int) -> str:
+    """
+        Отдает repr(value) или его начало длиной не менее limit символов.
+
+        Для списков, кортежей и словарей представление собирается
+        поэлементно и только до нужной длины.
+    """
+    brackets = CONTAINER_BRACKETS.get(type(value))
+    if brackets is None:
+        return repr(value)
+
+    is_dict = type(value) is dict
+
+    parts = [brackets[0]]
+    length = 1
+
+    for i, item in enumerate(value.items() if is_dict else value):
+        if length >= limit:
+            return ''.join(parts)
+        if i:
+            parts.append(', ')
+            length += 2
+        if is_dict:
+            part = _get_repr_prefix(item[0], limit - length)
+            parts.append(part)
+            length += len(part)
+            if length >= limit:
+                return ''.join(parts)
+            parts.append(': ')
+            length += 2
+            item = item[1]
+        part = _get_repr_prefix(item, limit - length)
+        parts.append(part)
+        length += len(part)
+
+    if type(value) is tuple and len(value) == 1:
+        parts.append(',')
+    parts.append(brackets[1])
+
+    return ''.join(parts)
+
+
 def get_value_repr(value: Any) -> str:
     """
         Отдать строковое представление значения длиной не более MAX_REPR.
     """
-    result = str(value)
+    brackets = CONTAINER_BRACKETS.get(type(value))
+    if brackets is None:
+        result = str(value)
+        last_char = result[-1:]
+    else:
+        # Для контейнеров str() совпадает с repr(), а последний символ -
+        # закрывающая скобка, поэтому достаточно начала представления
+        result = _get_repr_prefix(value, MAX_REPR + 1)
+        last_char = brackets[1]
+
     if len(result) > MAX_REPR:
-        result = result[:MAX_REPR-4] + '...' + result[-1]
+        result = result[:MAX_REPR-4] + '...' + last_char
 
     return result
 
 
+class LazyError:
+    """
+        Отложенная ошибка валидации.
+
+        Хранит проверявшееся значение и остальные аргументы для датакласса
+        ошибки error_class. Сам датакласс создается только методом build(),
+        то есть когда ошибки действительно запрашиваются, например функцией
+        get_errors().
+
+        Когда ошибка сохраняется в результате валидации (см.
+        freeze_errors()), у списков, кортежей и словарей сразу вычисляется
+        строковое представление (только его начало, см. get_value_repr()),
+        а сам контейнер больше не хранится: ошибка не удерживает его в
+        памяти и не зависит от его последующих изменений. Остальные
+        значения (например, множества и экземпляры пользовательских
+        классов) хранятся как есть, и их представление вычисляется из
+        текущего состояния значения при запросе ошибок.
+    """
+    __slots__ = ('error_class', 'value', 'value_repr', 'value_type', 'kwargs')
+
+    def __init__(self, error_class: type, value: Any, **kwargs: Any) -> None:
+        self.error_class = error_class
+        self.value = value
+        self.value_repr = None
+        self.kwargs = kwargs
+
+    def freeze(self) -> None:
+        """
+            Вычисляет представление значения-контейнера и перестает
+            хранить само значение.
+        """
+        if self.value_repr is None and \
+                type(self.value) in CONTAINER_BRACKETS:
+            self.value_repr = get_value_repr(self.value)
+            self.value_type = type(self.value)
+            self.value = None
+
+        errors = self.kwargs.get('errors')
+        if errors:
+            freeze_errors(errors)
+
+    def build(self) -> Any:
+        """
+            Создает датакласс ошибки.
+        """
+        if self.value_repr is None:
+            value_repr = get_value_repr(self.value)
+            value_type = type(self.value)
+        else:
+            value_repr = self.value_repr
+            value_type = self.value_type
+
+        # Имена полей датакласса ошибки для представления и типа значения
+        repr_name, type_name = getattr(
+            self.error_class, '_value_fields__vdc',
+            ('value_repr', 'value_type')
+        )
+        return self.error_class(
+            **{repr_name: value_repr, type_name: value_type}, **self.kwargs
+        )
+
+
+def freeze_errors(errors: Any) -> None:
+    """
+        Вызывает LazyError.freeze() у всех отложенных ошибок в словаре
+        ошибок или в списке ошибок errors, включая ошибки вложенных
+        экземпляров и словарей.
+
+        Вызывается при сохранении результата валидации, поэтому
+        представления вычисляются только у ошибок, которые останутся (а не,
+        например, у ошибок неподошедших типов Union).
+    """
+    if isinstance(errors, dict):
+        for field_errors in errors.values():
+            freeze_errors(field_errors)
+
+    elif isinstance(errors, list):
+        for error in errors:
+            if isinstance(error, LazyError):
+                error.freeze()
+
+
+def build_errors(errors: Any) -> Any:
+    """
+        Заменяет (на месте) все отложенные ошибки LazyError в словаре
+        ошибок или в списке ошибок errors на датаклассы ошибок, включая
+        ошибки вложенных экземпляров. Возвращает errors.
+    """
+    if isinstance(errors, dict):
+        for field_errors in errors.values():
+            build_errors(field_errors)
+
+    elif isinstance(errors, list):
+        for index, error in enumerate(errors):
+            if isinstance(error, LazyError):
+                error = error.build()
+                errors[index] = error
+            if isinstance(error, InstanceValidationError) and error.errors:
+                build_errors(error.errors)
+
+    return errors
+
+
+class ValidationContext:
+    """
+        Состояние одного запуска валидации экземпляра.
+
+        Создается заново при каждом запуске валидации и передается во все
+        методы проверки, поэтому сам экземпляр во время валидации не
+        изменяется, и один и тот же экземпляр можно проверять одновременно
+        из нескольких потоков.
+    """
+    __slots__ = (
+        'errors', 'field_errors', 'field_name', 'field_value',
+        'field_annotation', 'is_replace', 'replacement', 'replacements',
+        'typing_field_error', 'fail_fast', 'data', 'build_instances',
+        'annotation_plans',
+    )
+
+    def __init__(self) -> None:
+        # Ошибки всего экземпляра: {имя поля: список ошибок поля}
+        self.errors = {}
+
+        # Текущее поле
+        self.field_errors = []
+        self.field_name = None
+        self.field_value = None
+        self.field_annotation = None
+
+        # Выполнять ли замену словаря на экземпляр класса-потомка
+        # InstanceValidation из аннотации поля (в случае пригодности
+        # словаря для создания такого экземпляра), или Нет.
+        self.is_replace = True
+        # Значение для замены значения текущего поля
+        self.replacement = None
+        # Замены, которые будут выполнены после проверки всех полей:
+        # {имя поля: новое значение}
+        self.replacements = {}
+
+        # Ошибка, найденная при проверке алиаса из модуля typing
+        self.typing_field_error = None
+
+        # Режим "до первой ошибки": валидация останавливается на первом
+        # невалидном поле, а ошибки не создаются
+        self.fail_fast = False
+
+        # Словарь, значения из которого проверяются вместо значений полей
+        # экземпляра (см. InstanceValidation.validate_dict())
+        self.data = None
+        # Создавать ли экземпляры потомков InstanceValidation из
+        # словарей-значений, или только проверять словари
+        self.build_instances = True
+
+        # Разобранные аннотации полей класса проверяемого экземпляра:
+        # {id(аннотация): AnnotationPlan} (см. TypingValidation)
+        self.annotation_plans = None
+
+
+class ValidationProfiler:
+    """
+        Сбор статистики валидации: количество проверок и суммарное время
+        (в секундах) по классам, по полям классов и по видам аннотаций
+        (union, list, literal и т.д., а также nested_instance - создание
+        или перепроверка вложенного экземпляра, и nested_dict - проверка
+        вложенного словаря в validate_dict()).
+
+        Включается для всех потоков на время блока with:
+
+            with ValidationProfiler() as profiler:
+                ...
+            metrics = profiler.to_dict()
+
+        или методами start() и stop(). Время вложенных проверок входит во
+        время внешних. Пока профилировщик не включен, валидация лишь
+        проверяет, что он равен None.
+    """
+    def __init__(self) -> None:
+        self.stats = {'classes': {}, 'fields': {}, 'annotations': {}}
+        self.lock = threading.Lock()
+        self.previous = None
+
+    def start(self) -> 'ValidationProfiler':
+        """
+            Включает сбор статистики (вместо ранее включенного
+            профилировщика, который будет восстановлен методом stop()).
+        """
+        global _profiler
+        self.previous = _profiler
+        _profiler = self
+        return self
+
+    def stop(self) -> None:
+        """
+            Выключает сбор статистики.
+        """
+        global _profiler
+        _profiler = self.previous
+        self.previous = None
+
+    def __enter__(self) -> 'ValidationProfiler':
+        return self.start()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
+
+    def record(self, section: str, key: str, elapsed: float) -> None:
+        """
+            Добавляет одну проверку длительностью elapsed в статистику
+            раздела section ('classes', 'fields' или 'annotations').
+        """
+        with self.lock:
+            item = self.stats[section].get(key)
+            if item is None:
+                self.stats[section][key] = [1, elapsed]
+            else:
+                item[0] += 1
+                item[1] += elapsed
+
+    def call(
+        self, section: str, key: str, function: Callable, *args: Any
+    ) -> Any:
+        """
+            Вызывает function(*args) и записывает время вызова в
+            статистику.
+        """
+        start = perf_counter()
+        try:
+            return function(*args)
+        finally:
+            self.record(section, key, perf_counter() - start)
+
+    def reset(self) -> None:
+        """
+            Очищает статистику.
+        """
+        with self.lock:
+            for section in self.stats.values():
+                section.clear()
+
+    def to_dict(self) -> dict:
+        """
+            Отдает статистику в виде
+            {раздел: {ключ: {'count': количество, 'time': секунды}}},
+            где ключ - имя класса, 'Класс.поле' или вид аннотации.
+        """
+        with self.lock:
+            return {
+                section_name: {
+                    key: {'count': count, 'time': elapsed}
+                    for key, (count, elapsed) in section.items()
+                }
+                for section_name, section in self.stats.items()
+            }
+
+
+# Включенный профилировщик (None - статистика не собирается)
+_profiler = None
+
+
 @dataclass
 class BasicValidation:
     """
@@ -83,7 +430,48 @@ class BasicValidation:
 
         Для аннотаций полей можно использовать стандартные типы Python и
         классы созданные пользователем.
+
+        Все промежуточное состояние валидации хранится в ValidationContext,
+        а у экземпляра остается только результат - словарь ошибок (для него
+        объявлен слот, поэтому потомки могут обходиться без __dict__,
+        см. add_slots()).
     """
+    __slots__ = ('_errors__vdc', )
+
+    # Режим "до первой ошибки" по умолчанию для экземпляров класса: при нем
+    # валидация останавливается на первом невалидном поле, ошибки не
+    # создаются, и в словаре ошибок будет только имя этого поля (с пустым
+    # списком ошибок)
+    _fail_fast__vdc = False
+
+    # Отслеживание присваиваний полям. Если включено (в классе объявлено
+    # _track_changes__vdc = True), то повторная валидация проверяет только
+    # поля, которым присваивались значения после предыдущей валидации, и
+    # поля, у которых были ошибки. Изменения внутри значений полей
+    # (например, list.append() или присваивание атрибуту вложенного
+    # экземпляра) не отслеживаются - чтобы поле было проверено, ему нужно
+    # присвоить значение заново.
+    _track_changes__vdc = False
+
+    # Проверка поля при присваивании ему значения. Если включена (в классе
+    # объявлено _validate_assignment__vdc = True), то после создания
+    # экземпляра каждое присваивание полю проверяет только это поле и
+    # обновляет его ошибки в словаре ошибок экземпляра (исключение при
+    # этом не возникает). Словарь-значение, как и при создании экземпляра,
+    # заменяется на экземпляр класса из аннотации.
+    _validate_assignment__vdc = False
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+
+        super().__init_subclass__(**kwargs)
+
+        is_hooked = cls._track_changes__vdc or cls._validate_assignment__vdc
+
+        # Перехватчик оборачивает и собственный __setattr__() класса
+        if is_hooked and \
+                not _has_setattr_flag(cls.__setattr__, 'hooked__vdc'):
+            cls.__setattr__ = _make_setattr_hook(cls.__setattr__)
+
     def __post_init__(self) -> None:
         """
             Запускает валидацию после создания экземпляра
@@ -106,7 +494,7 @@ class BasicValidation:
             "and 'get_errors(instance)'."
         )
 
-        return self._errors__vdc if self._errors__vdc else None
+        return build_errors(self._errors__vdc) if self._errors__vdc else None
 
     def is_valid(self) -> bool:
         """
@@ -126,13 +514,16 @@ class BasicValidation:
 
         return not bool(self._errors__vdc)
 
-    def _init_validation(self) -> None:
+    def _init_validation(self) -> ValidationContext:
         """
-            Инициализация валидации
+            Инициализация валидации, возвращает контекст нового запуска
+            валидации
         """
-        self._errors__vdc = {}
+        return ValidationContext()
 
-    def _is_instance__vdc(self, value: Any, annotation: type) -> bool:
+    def _is_instance__vdc(
+        self, value: Any, annotation: type, ctx: ValidationContext
+    ) -> bool:
         """
             Проверка значения на соответствие типу.
         """
@@ -144,346 +535,2185 @@ class BasicValidation:
             exception = exс
             result = False
 
-        if not result:
-            self._field_errors__vdc.append(BasicValidationError(
-                value_repr=get_value_repr(value), value_type=type(value),
+        if not result and not ctx.fail_fast:
+            ctx.field_errors.append(LazyError(
+                BasicValidationError, value,
                 annotation=annotation, exception=exception
             ))
 
         return result
 
-    def _init_field_validation(self, field: DataclassesField) -> None:
+    def _init_field_validation(
+        self, field: DataclassesField, ctx: ValidationContext
+    ) -> None:
         """
             Инициализация валидации для текущего поля
         """
-        self._field_errors__vdc = []
-        self._field_name__vdc = field.name
-        self._field_value__vdc = getattr(self, field.name)
-        self._field_annotation__vdc = field.type
-
-    def _is_field_valid__vdc(self, field: DataclassesField) -> bool:
+        ctx.field_errors = []
+        ctx.field_name = field.name
+        if ctx.data is None:
+            ctx.field_value = getattr(self, field.name)
+        else:
+            ctx.field_value = ctx.data[field.name]
+        ctx.field_annotation = self._get_field_types__vdc()[field.name]
+
+    def _is_field_valid__vdc(
+        self, field: DataclassesField, ctx: ValidationContext
+    ) -> bool:
         """
             Запускает проверку поля, и возвращает результат валидации.
         """
-        self._init_field_validation(field)
+        self._init_field_validation(field, ctx)
 
         return self._is_instance__vdc(
-            self._field_value__vdc, self._field_annotation__vdc
+            ctx.field_value, ctx.field_annotation, ctx
         )
 
-    def _save_current_field_errors(self) -> None:
+    def _save_current_field_errors(self, ctx: ValidationContext) -> None:
         """
-            Записывает ошибки текущего поля в self._errors
+            Записывает ошибки текущего поля в ctx.errors
             (в ошибки всего экземпляра)
         """
-        self._errors__vdc[self._field_name__vdc] = self._field_errors__vdc
+        ctx.errors[ctx.field_name] = ctx.field_errors
 
-    def _run_validation(self) -> None:
+    def _finish_validation(self, ctx: ValidationContext) -> None:
+        """
+            Завершение валидации: сохраняет у экземпляра ее результат.
+        """
+        if ctx.errors:
+            freeze_errors(ctx.errors)
+        # object.__setattr__ - чтобы работало и с frozen датаклассами
+        object.__setattr__(self, '_errors__vdc', ctx.errors)
+
+    @classmethod
+    def _build_validation_plan__vdc(cls) -> tuple:
         """
-           Запускает проверку всех полей
+            Строит план валидации класса - кортеж его полей.
         """
-        self._init_validation()
+        return tuple(dataclasses_fields(cls))
 
-        for field in dataclasses_fields(self):
-            if not self._is_field_valid__vdc(field):
-                self._save_current_field_errors()
+    @classmethod
+    def _get_validation_plan__vdc(cls) -> tuple:
+        """
+            Возвращает план валидации класса.
 
+            План строится один раз, при первом обращении, и сохраняется в
+            самом классе (у каждого класса-потомка - свой план).
+        """
+        plan = cls.__dict__.get('_validation_plan__vdc')
+        if plan is None:
+            plan = cls._build_validation_plan__vdc()
+            cls._validation_plan__vdc = plan
+        return plan
 
-def get_errors(instance: BasicValidation) -> Optional[Sequence]:
-    """
-        Отдает словарь ошибок или None если их нет.
-    """
-    return instance._errors__vdc if instance._errors__vdc else None
+    @classmethod
+    def _build_field_types__vdc(cls) -> dict:
+        """
+            Строит словарь {имя поля: аннотация поля}, в котором строковые
+            аннотации (from __future__ import annotations, ссылки вперед
+            вида 'Node' или List['Node']) заменены на вычисленные типы.
 
+            Имя самого класса доступно в аннотациях всегда, поэтому класс
+            может ссылаться сам на себя, даже если он объявлен внутри
+            функции.
+        """
+        localns = {cls.__name__: cls}
 
-def is_valid(instance: BasicValidation) -> bool:
-    """
-        Запускает валидацию датакласса.
-        Отдает True если датакласс валиден и False если нет.
-    """
-    instance._run_validation()
+        try:
+            hints = get_type_hints(cls, localns=localns)
+        except Exception:
+            # Хотя бы одна аннотация не вычисляется - ниже вычислим
+            # строковые аннотации по отдельности
+            hints = {}
 
-    return not bool(instance._errors__vdc)
+        module = sys.modules.get(cls.__module__)
+        globalns = getattr(module, '__dict__', {})
 
+        field_types = {}
+        for field in dataclasses_fields(cls):
+            annotation = hints.get(field.name, field.type)
+            if isinstance(annotation, str):
+                try:
+                    annotation = eval(annotation, globalns, localns)
+                except Exception:
+                    # Ошибка будет в результатах валидации поля
+                    pass
+            field_types[field.name] = annotation
 
-# ----------------------------------------------------------------------------
+        return field_types
 
+    @classmethod
+    def _get_field_types__vdc(cls) -> dict:
+        """
+            Возвращает словарь {имя поля: аннотация поля} с вычисленными
+            строковыми аннотациями.
+
+            Аннотации вычисляются при первом обращении и сохраняются в
+            самом классе, но только если вычислены все они. Если какая-то
+            аннотация ссылается на еще не объявленный класс, то результат
+            не сохраняется, и при следующем обращении аннотации будут
+            вычислены снова.
+        """
+        field_types = cls.__dict__.get('_field_types__vdc')
+        if field_types is None:
+            field_types = cls._build_field_types__vdc()
+            if all(map(is_resolved_annotation, field_types.values())):
+                cls._field_types__vdc = field_types
+        return field_types
 
-@dataclass
-class InstanceValidationError(BasicValidationError):
-    errors: Optional[List]
+    @classmethod
+    def _has_resolved_field_types__vdc(cls) -> bool:
+        """
+            Проверяет, вычислены ли (и сохранены в классе) все аннотации
+            полей. Данные, построенные по аннотациям полей, сохраняются в
+            классе только в этом случае.
+        """
+        cls._get_field_types__vdc()
+        return '_field_types__vdc' in cls.__dict__
 
+    def _validate_field__vdc(self, name: str) -> None:
+        """
+            Проверяет одно поле (после присваивания ему значения) и
+            обновляет его ошибки в словаре ошибок экземпляра.
+        """
+        errors = getattr(self, '_errors__vdc', None)
+        if errors is None:
+            # Экземпляр еще создается, поля проверит __post_init__()
+            return
 
-@dataclass
-class InstanceValidation(BasicValidation):
+        field = self._get_plan_fields__vdc().get(name)
+        if field is None:
+            return
+
+        ctx = self._init_validation()
+        ctx.fail_fast = self._fail_fast__vdc
+
+        if not self._is_field_valid__vdc(field, ctx):
+            self._save_current_field_errors(ctx)
+
+        # Ошибки остальных полей остаются прежними
+        field_errors = ctx.errors
+        ctx.errors = {
+            key: value for key, value in errors.items() if key != name
+        }
+        ctx.errors.update(field_errors)
+
+        self._finish_validation(ctx)
+
+    @classmethod
+    def _get_plan_fields__vdc(cls) -> dict:
+        """
+            Возвращает поля плана валидации класса в словаре
+            {имя поля: поле}.
+        """
+        plan_fields = cls.__dict__.get('_plan_fields__vdc')
+        if plan_fields is None:
+            plan_fields = {
+                field.name: field for field in cls._get_validation_plan__vdc()
+            }
+            cls._plan_fields__vdc = plan_fields
+        return plan_fields
+
+    def _run_validation(self, fail_fast: Optional[bool] = None) -> None:
+        """
+           Запускает проверку всех полей.
+
+           fail_fast - включить (True) или выключить (False) режим "до первой
+           ошибки" для этого запуска, по умолчанию (None) он берется из
+           атрибута класса _fail_fast__vdc.
+        """
+        profiler = _profiler
+        if profiler is not None:
+            start = perf_counter()
+
+        ctx = self._init_validation()
+        ctx.fail_fast = self._fail_fast__vdc if fail_fast is None \
+            else fail_fast
+
+        # Поля, которым присваивались значения после предыдущей валидации,
+        # или None, если нужно проверить все поля
+        changed = None
+        if self._track_changes__vdc:
+            changed = getattr(self, '_changed__vdc', None)
+
+        is_stopped = False
+
+        for field in self._get_validation_plan__vdc():
+            if changed is not None and field.name not in changed and \
+                    field.name not in self._errors__vdc:
+                # Поле не менялось и было валидным
+                continue
+            if profiler is None:
+                is_valid_field = self._is_field_valid__vdc(field, ctx)
+            else:
+                is_valid_field = profiler.call(
+                    'fields', f'{type(self).__qualname__}.{field.name}',
+                    self._is_field_valid__vdc, field, ctx
+                )
+            if not is_valid_field:
+                self._save_current_field_errors(ctx)
+                if ctx.fail_fast:
+                    is_stopped = True
+                    break
+
+        self._finish_validation(ctx)
+
+        if self._track_changes__vdc:
+            # После остановки на первой ошибке часть полей не проверена,
+            # поэтому следующая валидация будет полной
+            try:
+                object.__setattr__(
+                    self, '_changed__vdc', None if is_stopped else set()
+                )
+            except AttributeError:
+                # Нет ни __dict__, ни слота (например, у класса
+                # @dataclass(slots=True)) - каждая валидация будет полной
+                pass
+
+        if profiler is not None:
+            profiler.record(
+                'classes', type(self).__qualname__, perf_counter() - start
+            )
+
+
+def is_resolved_annotation(annotation: Any) -> bool:
     """
-        Добавляет возможность при создании экземпляра использовать словарь,
-        при инициализации значения поля, вместо экземпляра потомка
-        InstanceValidation указанного в аннотации поля.
+        Проверяет, что в аннотации (и во вложенных в нее аннотациях) не
+        осталось строк и ForwardRef, то есть ссылок на еще не объявленные
+        классы.
+    """
+    if isinstance(annotation, (str, ForwardRef)):
+        return False
 
-        Это может пригодиться, например, при получении json-словаря по апи,
-        для автоматической валидации значений.
+    if get_origin(annotation) is Literal:
+        # У Literal в аргументах значения, а не аннотации
+        return True
 
-        Так же, при этом, происходит замена словаря на экземпляр датакласса
-        из аннотации (если данные из словаря валидны).
+    return all(map(is_resolved_annotation, get_args(annotation)))
+
+
+def _make_setattr_hook(setattr_: Callable) -> Callable:
     """
-    def _init_validation(self) -> None:
+        Возвращает __setattr__(), который вызывает setattr_(), а затем
+        проверяет поле (если включена проверка при присваивании) или
+        запоминает имя атрибута в множестве изменений экземпляра
+        _changed__vdc (если оно уже создано, то есть после первой
+        валидации).
+    """
+    def __setattr__(self: BasicValidation, name: str, value: Any) -> None:
+        setattr_(self, name, value)
+        if self._validate_assignment__vdc:
+            self._validate_field__vdc(name)
+        else:
+            changed = getattr(self, '_changed__vdc', None)
+            if changed is not None:
+                changed.add(name)
 
-        super()._init_validation()
+    __setattr__.hooked__vdc = True
+    __setattr__.__wrapped__ = setattr_
 
-        # Выполнять ли замену словаря на экземпляр класса-потомка
-        # InstanceValidation из аннотации поля (в случае пригодности
-        # словаря для создания такого экземпляра), или Нет.
-        self._is_replace__vdc = True
+    return __setattr__
 
-        self._replaced_field_names = []
 
-    def _is_instance__vdc(self, value: Any, annotation: type) -> bool:
+def _has_setattr_flag(setattr_: Callable, flag: str) -> bool:
+    """
+        Проверяет, есть ли в цепочке обернутых друг в друга __setattr__()
+        (см. _make_setattr_hook()) функция с атрибутом-флагом flag.
+    """
+    while setattr_ is not None:
+        if getattr(setattr_, flag, False):
+            return True
+        setattr_ = getattr(setattr_, '__wrapped__', None)
+    return False
 
-        is_type = type(annotation) == type
-        if is_type and issubclass(annotation, InstanceValidation):
 
-            exception = None
-            errors = None
-            instance = None
+def get_errors(instance: BasicValidation) -> Optional[Sequence]:
+    """
+        Отдает словарь ошибок или None если их нет.
 
-            if isinstance(value, dict) or isinstance(value, annotation):
+        Датаклассы ошибок создаются при первом запросе ошибок.
+    """
+    errors = instance._errors__vdc
 
-                if isinstance(value, annotation):
-                    value = asdict(value)
+    return build_errors(errors) if errors else None
 
-                try:
-                    instance = annotation(**value)
-                    errors = instance._errors__vdc if instance._errors__vdc \
-                        else None
-                except Exception as exc:
-                    exception = exc
-
-                if errors is None and exception is None:
-                    self._replacement__vdc = instance
-                    return True
 
-                self._field_errors__vdc.append(InstanceValidationError(
-                    value_repr=get_value_repr(value), value_type=type(value),
-                    annotation=annotation, exception=exception, errors=errors
-                ))
-                return False
+def is_valid(
+    instance: BasicValidation, fail_fast: Optional[bool] = None
+) -> bool:
+    """
+        Запускает валидацию датакласса.
+        Отдает True если датакласс валиден и False если нет.
 
-        return super()._is_instance__vdc(value, annotation)
+        При fail_fast=True валидация останавливается на первом невалидном
+        поле и не создает ошибок (по умолчанию режим берется из атрибута
+        класса _fail_fast__vdc).
+    """
+    instance._run_validation(fail_fast=fail_fast)
 
-    def _init_field_validation(self, field: DataclassesField) -> None:
+    return not bool(instance._errors__vdc)
 
-        super()._init_field_validation(field)
 
-        # Свойство предназначенное для замены словаря
-        self._replacement__vdc = None
+def serialize_errors(errors: Any) -> Any:
+    """
+        Переводит ошибки (словарь, который отдает get_errors(), список
+        ошибок или отдельную ошибку) в компактный вид из словарей, списков,
+        строк и чисел, который можно передать между процессами или
+        сохранить в json.
 
-    def _try_replacing(self) -> None:
-        """
-            Пытается заменить значение у текущего поля на текущее значение
-            свойства self._replacement__vdc.
-        """
-        # Если включен флаг замены и есть чем заменять, то установим
-        # новое значение у поля
-        if self._is_replace__vdc and self._replacement__vdc is not None:
-            setattr(self, self._field_name__vdc, self._replacement__vdc)
-            self._replaced_field_names.append(self._field_name__vdc)
+        Датаклассы ошибок становятся словарями (имя класса ошибки в ключе
+        'error'), исключения - строкой repr(), типы и аннотации - строкой.
+    """
+    if errors is None or isinstance(errors, (str, int, float)):
+        return errors
 
-    def _is_field_valid__vdc(self, field: DataclassesField) -> bool:
+    if isinstance(errors, dict):
+        return {key: serialize_errors(value) for key, value in errors.items()}
 
-        result = super()._is_field_valid__vdc(field)
+    if isinstance(errors, (list, tuple)):
+        return [serialize_errors(error) for error in errors]
 
-        if result:
-            # Попробуем произвести замену
-            self._try_replacing()
+    if isinstance(errors, BaseException):
+        return repr(errors)
 
+    if isinstance(errors, LazyError):
+        return serialize_errors(build_errors([errors])[0])
+
+    if is_dataclass(errors) and not isinstance(errors, type):
+        result = {'error': type(errors).__name__}
+        for field in dataclasses_fields(errors):
+            result[field.name] = serialize_errors(getattr(errors, field.name))
         return result
 
+    # Тип или аннотация
+    if type(errors) == type:
+        return errors.__qualname__
 
-# ----------------------------------------------------------------------------
+    return str(errors)
 
 
-# Строковые представления для всех поддерживаемых алиасов:
-STR_ALIASES = {
-    List: str(List),
-    Union: str(Union),
-    Optional: str(Optional),
-    Any: str(Any),
-    Literal: str(Literal)
-}
+# Имена атрибутов класса, в которых хранятся вычисленные для него данные
+# (план валидации и т.п.)
+CLASS_CACHE_NAMES = (
+    '_validation_plan__vdc', '_plan_fields__vdc', '_field_types__vdc',
+    '_init_keys__vdc', '_prototype__vdc', '_local_validated_dc__vdc',
+    '_nested_validated_dc__vdc', '_instance_cache__vdc',
+    '_annotation_plans__vdc',
+)
 
 
-@dataclass
-class TypingValidationError(BasicValidationError):
-    pass
+def _get_slots(cls: type) -> Tuple[str, ...]:
+    """
+        Отдает слоты, объявленные в самом классе cls.
+    """
+    slots = cls.__dict__.get('__slots__', ())
+    if isinstance(slots, str):
+        return (slots, )
+    return tuple(slots)
 
 
-@dataclass
-class ListValidationError:
-    item_index: int
-    item_repr:  str   # Строковое представление элемента или его части
-    item_type:  type  # Тип элемента
-    annotation: type  # Тип в аннотации
+def _update_class_cell(value: Any, old_cls: type, new_cls: type) -> None:
+    """
+        Перепривязывает ячейку __class__ замыкания функции (ее использует
+        super() без аргументов) со старого класса на новый.
+        value - значение из словаря класса: функция, classmethod,
+        staticmethod или property.
+    """
+    if isinstance(value, (classmethod, staticmethod)):
+        value = value.__func__
+    if isinstance(value, property):
+        for function in (value.fget, value.fset, value.fdel):
+            _update_class_cell(function, old_cls, new_cls)
+        return
 
+    code = getattr(value, '__code__', None)
+    closure = getattr(value, '__closure__', None)
+    if code is None or not closure or '__class__' not in code.co_freevars:
+        return
 
-@dataclass
-class LiteralValidationError:
-    literal_repr: str   # Строковое представление литерала или его части
-    literal_type: type  # Тип литерала
-    annotation: type    # Тип в аннотации
+    cell = closure[code.co_freevars.index('__class__')]
+    if cell.cell_contents is old_cls:
+        cell.cell_contents = new_cls
 
 
-@dataclass
-class TypingValidation(InstanceValidation):
+def add_slots(cls: type) -> type:
     """
-        Добавляет для использования в аннотациях некоторые алиасы из модуля
-        typing.
-
-        Поддерживаемые алиасы перечислены в константе STR_ALIASES.
+        Декоратор для датакласса-потомка BasicValidation, который
+        пересоздает класс с __slots__ из имен его полей.
+
+        У экземпляров такого класса нет __dict__, есть только поля и слот
+        для словаря ошибок (и слот для множества изменений, если включено
+        отслеживание присваиваний _track_changes__vdc), что заметно
+        уменьшает занимаемую ими память.
+        Применяется поверх декоратора dataclass:
+
+            @add_slots
+            @dataclass
+            class Phone(ValidatedDC):
+                phone: str
+
+        (в Python 3.10 и новее вместо него можно использовать
+        @dataclass(slots=True)).
     """
-    def _is_instance__vdc(self, value: Any, annotation: type) -> bool:
+    if '__slots__' in cls.__dict__:
+        raise TypeError(f'{cls.__name__} already specifies __slots__')
 
-        str_annotation = str(annotation)
+    inherited_slots = set()
+    for base in cls.__mro__[1:-1]:
+        inherited_slots.update(_get_slots(base))
 
-        if self._is_typing_alias(str_annotation):
+    field_names = tuple(field.name for field in dataclasses_fields(cls))
 
-            if not self._is_supported_alias(str_annotation):
+    cls_dict = dict(cls.__dict__)
+    slot_names = field_names
+    if cls._track_changes__vdc:
+        slot_names += ('_changed__vdc', )
 
-                exception = TypeError('Alias is not supported!')
-                self._field_errors__vdc.append(TypingValidationError(
-                    value_repr=get_value_repr(value), value_type=type(value),
-                    annotation=annotation, exception=exception
-                ))
-                return False
+    cls_dict['__slots__'] = tuple(
+        name for name in slot_names if name not in inherited_slots
+    )
+    # Значения по умолчанию полей уже есть в __init__, а атрибуты класса с
+    # теми же именами конфликтуют со слотами
+    for name in field_names:
+        cls_dict.pop(name, None)
+    cls_dict.pop('__dict__', None)
+    cls_dict.pop('__weakref__', None)
+    # План валидации и остальные данные, которые хранятся в классе, будут
+    # вычислены уже для нового класса
+    for name in CLASS_CACHE_NAMES:
+        cls_dict.pop(name, None)
 
-            is_instance = self._get_alias_method(str_annotation)
+    new_cls = type(cls)(cls.__name__, cls.__bases__, cls_dict)
+    new_cls.__qualname__ = cls.__qualname__
 
-            if is_instance is not None:
-                self._typing_field_error = None
-                result = is_instance(value, annotation)
-                if result:
-                    return True
-                else:
-                    if self._typing_field_error is not None:
-                        self._field_errors__vdc.append(
-                            self._typing_field_error
-                        )
-                        self._typing_field_error = None
-                    return False
+    # Методы, которые вызывают super() без аргументов, должны ссылаться на
+    # новый класс, а не на исходный
+    for value in new_cls.__dict__.values():
+        _update_class_cell(value, cls, new_cls)
 
-        return super()._is_instance__vdc(value, annotation)
+    return new_cls
 
-    @staticmethod
-    def _is_typing_alias(annotation: str) -> bool:
-        """
-            Проверяет является ли annotation алиасом из модуля typing
-        """
-        str_aliases = STR_ALIASES.values()
-        prefixes = [alias[:alias.find('.')] for alias in str_aliases]
-        return annotation.startswith(tuple(prefixes))
 
-    @staticmethod
-    def _is_supported_alias(annotation: str) -> bool:
-        """
-            Проверяет является ли annotation поддерживаемым алиасом
-        """
-        for str_alias in STR_ALIASES.values():
-            if annotation.startswith(str_alias):
-                return True
-        return False
+# ----------------------------------------------------------------------------
 
-    def _get_alias_method(self, annotation: str) -> Optional[Callable]:
-        """
-            Возавращает метод для проверки алиаса
-        """
 
-        if annotation.startswith(STR_ALIASES[Union]) or \
-           annotation.startswith(STR_ALIASES[Optional]):
-            return self._is_union_instance
+@dataclass
+class InstanceValidationError(BasicValidationError):
+    errors: Optional[List]
 
-        elif annotation.startswith(STR_ALIASES[List]):
-            return self._is_list_instance
 
-        elif annotation.startswith(STR_ALIASES[Literal]):
-            return self._is_literal_instance
+@dataclass
+class KeyValidationError:
+    key_repr: str     # Строковое представление ключа или его части
+    key_type: type    # Тип ключа
+    annotation: Optional[type]  # Тип в аннотации поля (если оно есть)
+    missing: bool     # Ключ отсутствует (иначе - лишний ключ)
 
-        elif annotation.startswith(STR_ALIASES[Any]):
-            return self._is_any_instance
+    # Имена полей для LazyError.build()
+    _value_fields__vdc = ('key_repr', 'key_type')
 
-    def _is_union_instance(self, value: Any, annotation: type) -> bool:
-        """
-            Валидация на алиасы Optional и Union.
 
-            Проверяет является ли value экземпляром одного из типов из
-            кортежа.
-        """
-        # У Union допустимые типы перечислены в кортеже __args__
-        for item_annotation in annotation.__args__:
-            if self._is_instance__vdc(value, item_annotation):
-                return True
-        # Нет ни одного типа, подходящего для value
-        return False
+def _make_read_only_setattr(setattr_: Callable) -> Callable:
+    """
+        Возвращает __setattr__(), который после создания экземпляра (то
+        есть после первой валидации) запрещает присваивания, а до этого
+        вызывает setattr_().
+    """
+    def __setattr__(self: BasicValidation, name: str, value: Any) -> None:
+        if getattr(self, '_errors__vdc', None) is not None:
+            raise FrozenInstanceError(f'cannot assign to field {name!r}')
+        setattr_(self, name, value)
 
-    def _is_list_instance(self, value: Any, annotation: type) -> bool:
-        """
-            Валидация на алиас List.
+    __setattr__.read_only__vdc = True
+    __setattr__.__wrapped__ = setattr_
 
-            Проверяет является ли value списком экземпляров annotation.
-        """
-        if isinstance(value, list):
-            # Имеем дело со списком. В родительском классе возможна замена
-            # значения-словаря на значение-экземпляр потомка родительского
-            # класса. То есть, возможно изменение списка значений текущего
-            # поля.
-            # Будем к этому готовы.
-            new_value = []
-
-            # У List допустимый тип стоит первым в кортеже __args__
-            annotation = annotation.__args__[0]
-            for i, item_value in enumerate(value):
-                if self._is_instance__vdc(item_value, annotation):
-                    # Собираем новый список для текущего поля
-                    # (так как в нем возможна замена элемента-словаря на
-                    # элемент-экземпляр потомка родительского класса)
-                    if self._replacement__vdc:
-                        item_value = self._replacement__vdc
-                        self._replacement__vdc = False
-                    new_value.append(item_value)
-                else:
-                    self._typing_field_error = ListValidationError(
-                        item_index=i, item_repr=get_value_repr(item_value),
-                        item_type=type(item_value), annotation=annotation
-                    )
-                    return False
+    return __setattr__
 
-            # Все элементы списка value валидные.
-            self._replacement__vdc = new_value
-            return True
 
-        self._typing_field_error = BasicValidationError(
-            value_repr=get_value_repr(value), value_type=type(value),
-            annotation=annotation, exception=None
-        )
+# Типы значений, из которых строится ключ кэша по содержимому словаря
+PAYLOAD_KEY_TYPES = (str, int, float, bool, type(None))
 
-        return False
 
-    def _is_literal_instance(self, value: Any, annotation: type) -> bool:
-        """
-            Валидация на алиас Literal.
+def get_payload_key(value: Any) -> Any:
+    """
+        Возвращает хешируемый ключ по содержимому value - словаря, списка
+        или кортежа из строк, чисел, True/False, None и таких же вложенных
+        словарей, списков и кортежей (то есть данных из json).
 
-            Проверяет является ли value одним из annotation.__args__
-        """
-        result = value in annotation.__args__
+        Порядок ключей словаря не важен, а значения разных типов (1, 1.0 и
+        True) дают разные ключи. Для других значений возбуждается
+        TypeError.
+    """
+    value_type = type(value)
 
-        if not result:
-            self._typing_field_error = LiteralValidationError(
-                literal_repr=get_value_repr(value), literal_type=type(value),
-                annotation=annotation
-            )
+    if value_type is dict:
+        return dict, tuple(sorted(
+            (key, get_payload_key(item)) for key, item in value.items()
+        ))
+
+    if value_type is list or value_type is tuple:
+        return value_type, tuple(map(get_payload_key, value))
+
+    if value_type in PAYLOAD_KEY_TYPES:
+        return value_type, value
+
+    raise TypeError(f'Unsupported payload value type: {value_type}')
+
+
+class InstanceCache:
+    """
+        Ограниченный потокобезопасный кэш LRU результатов создания
+        экземпляров из словарей: {ключ: (экземпляр или None, ошибка или
+        None)}.
+    """
+    __slots__ = ('maxsize', 'data', 'lock', 'hits', 'misses', 'evictions')
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self.data = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Any) -> Optional[tuple]:
+        with self.lock:
+            result = self.data.get(key)
+            if result is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self.data.move_to_end(key)
+            return result
+
+    def put(self, key: Any, result: tuple) -> None:
+        with self.lock:
+            self.data[key] = result
+            self.data.move_to_end(key)
+            while len(self.data) > self.maxsize:
+                self.data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self.lock:
+            self.data.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def get_info(self) -> dict:
+        with self.lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'maxsize': self.maxsize,
+                'currsize': len(self.data),
+            }
+
+
+# Размер части пакета для validate_parallel() по умолчанию
+PARALLEL_CHUNK_SIZE = 1000
+
+
+@dataclass
+class InstanceValidation(BasicValidation):
+    """
+        Добавляет возможность при создании экземпляра использовать словарь,
+        при инициализации значения поля, вместо экземпляра потомка
+        InstanceValidation указанного в аннотации поля.
+
+        Это может пригодиться, например, при получении json-словаря по апи,
+        для автоматической валидации значений.
+
+        Так же, при этом, происходит замена словаря на экземпляр датакласса
+        из аннотации (если данные из словаря валидны).
+
+        Уже созданный экземпляр из аннотации поля не копируется, а
+        перепроверяется на месте. Если у класса установлен флаг
+        _trust_instances__vdc, то такой экземпляр считается валидным без
+        перепроверки, если при последней валидации у него не было ошибок.
+    """
+    __slots__ = ()
+
+    _trust_instances__vdc = False
+
+    # Имя поля-тега (дискриминатора), по значению которого в словаре
+    # выбирается класс из нескольких потомков InstanceValidation в Union
+    # (см. TypingValidation._is_union_instance())
+    _discriminator__vdc = None
+
+    # Размер кэша результатов создания экземпляров из словарей (0 - кэш
+    # выключен). Одинаковые словари получают один и тот же экземпляр (или
+    # одни и те же ошибки), поэтому при включенном кэше поля всех
+    # экземпляров класса (и его потомков), а не только взятых из кэша,
+    # после создания доступны только для чтения (присваивание вызывает
+    # FrozenInstanceError, как у frozen датаклассов, от которых нельзя
+    # наследоваться здесь, так как BasicValidation - не frozen).
+    # Кэшируются только словари, все значения которых - строки, числа,
+    # True/False или None, и только экземпляры, все поля которых (в том
+    # числе заполненные значениями по умолчанию) имеют такие же значения.
+    # Изменяемые значения (списки, словари, вложенные экземпляры) были бы
+    # общими у всех экземпляров из кэша, поэтому для таких словарей
+    # экземпляр каждый раз создается заново.
+    # Вместе с _validate_assignment__vdc или _track_changes__vdc кэш
+    # включить нельзя (при создании класса возникает TypeError).
+    _instance_cache_size__vdc = 0
+    # Функция, которая по словарю возвращает ключ кэша (или None, если
+    # результат для словаря кэшировать не нужно). По умолчанию ключ
+    # строится по содержимому словаря, см. get_payload_key().
+    _instance_cache_key__vdc = None
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+
+        super().__init_subclass__(**kwargs)
+
+        if cls._instance_cache_size__vdc and (
+            cls._validate_assignment__vdc or cls._track_changes__vdc
+        ):
+            # Экземпляры из кэша доступны только для чтения, поэтому
+            # присваиваний, которые можно было бы проверять или
+            # отслеживать, у них не бывает
+            raise TypeError(
+                f'{cls.__name__}: _instance_cache_size__vdc cannot be '
+                'combined with _validate_assignment__vdc or '
+                '_track_changes__vdc'
+            )
+
+        # Запрет присваиваний оборачивает любой уже установленный
+        # __setattr__(), в том числе собственный __setattr__() класса
+        if cls._instance_cache_size__vdc and \
+                not _has_setattr_flag(cls.__setattr__, 'read_only__vdc'):
+            cls.__setattr__ = _make_read_only_setattr(cls.__setattr__)
+
+    def _is_instance__vdc(
+        self, value: Any, annotation: type, ctx: ValidationContext
+    ) -> bool:
+
+        is_type = type(annotation) == type
+        if is_type and issubclass(annotation, InstanceValidation) and \
+                isinstance(value, (dict, annotation)):
+
+            profiler = _profiler
+
+            if not ctx.build_instances and isinstance(value, dict):
+                # Только проверка словаря, без создания экземпляра
+                if profiler is None:
+                    errors = annotation._validate_dict__vdc(
+                        value, ctx.fail_fast
+                    )
+                else:
+                    errors = profiler.call(
+                        'annotations', 'nested_dict',
+                        annotation._validate_dict__vdc, value, ctx.fail_fast
+                    )
+                if errors is None:
+                    return True
+                if not ctx.fail_fast:
+                    ctx.field_errors.append(LazyError(
+                        InstanceValidationError, value, annotation=annotation,
+                        exception=None, errors=errors
+                    ))
+                return False
+
+            if profiler is None:
+                instance, error = annotation._create_instance__vdc(
+                    value, self._trust_instances__vdc, ctx.fail_fast
+                )
+            else:
+                instance, error = profiler.call(
+                    'annotations', 'nested_instance',
+                    annotation._create_instance__vdc,
+                    value, self._trust_instances__vdc, ctx.fail_fast
+                )
+
+            if error is None:
+                if instance is not value:
+                    ctx.replacement = instance
+                return True
+
+            if not ctx.fail_fast:
+                ctx.field_errors.append(error)
+            return False
+
+        return super()._is_instance__vdc(value, annotation, ctx)
+
+    @classmethod
+    def _create_instance__vdc(
+        cls, value: Any, trust_instance: bool = False,
+        fail_fast: Optional[bool] = None
+    ) -> Tuple[Optional['InstanceValidation'], Optional[LazyError]]:
+        """
+            Получает экземпляр класса из значения value (словаря или
+            уже созданного экземпляра).
+
+            Возвращает кортеж (валидный экземпляр или None, отложенная
+            ошибка LazyError или None).
+
+            fail_fast - режим "до первой ошибки" для перепроверки уже
+            созданного экземпляра (экземпляр из словаря создается в режиме,
+            заданном в его классе).
+        """
+        if isinstance(value, cls):
+
+            # Экземпляр уже создан, проверим его без копирования
+            if not trust_instance:
+                value._run_validation(fail_fast=fail_fast)
+
+            if not value._errors__vdc:
+                return value, None
+
+            return None, LazyError(
+                InstanceValidationError, value, annotation=cls,
+                exception=None, errors=value._errors__vdc
+            )
+
+        if isinstance(value, dict):
+
+            cache = cls._get_instance_cache__vdc()
+            if cache is not None:
+                return cls._create_cached_instance__vdc(value, cache)
+
+            return cls._create_instance_from_dict__vdc(value)
+
+        return None, LazyError(
+            BasicValidationError, value, annotation=cls, exception=None
+        )
+
+    @classmethod
+    def _create_instance_from_dict__vdc(
+        cls, value: dict
+    ) -> Tuple[Optional['InstanceValidation'], Optional[LazyError]]:
+        """
+            Создает экземпляр класса из словаря value.
+
+            Возвращает кортеж (валидный экземпляр или None, отложенная
+            ошибка LazyError или None).
+        """
+        exception = None
+
+        # Отсутствующие и лишние ключи проверяются заранее, без
+        # исключения TypeError от __init__()
+        errors = cls._get_key_errors__vdc(value) or None
+
+        if errors is None:
+            try:
+                instance = cls(**value)
+                errors = instance._errors__vdc or None
+            except Exception as exc:
+                exception = exc
+
+            if errors is None and exception is None:
+                return instance, None
+
+        return None, LazyError(
+            InstanceValidationError, value,
+            annotation=cls, exception=exception, errors=errors
+        )
+
+    @classmethod
+    def _create_cached_instance__vdc(
+        cls, value: dict, cache: 'InstanceCache'
+    ) -> Tuple[Optional['InstanceValidation'], Optional[LazyError]]:
+        """
+            Создает экземпляр класса из словаря value (как
+            _create_instance__vdc()) или берет результат из кэша.
+        """
+        if not all(
+            type(item) in PAYLOAD_KEY_TYPES for item in value.values()
+        ):
+            # Значения-контейнеры не кэшируются (см. комментарий к
+            # _instance_cache_size__vdc)
+            return cls._create_instance_from_dict__vdc(value)
+
+        key_function = cls._instance_cache_key__vdc
+        try:
+            if key_function is None:
+                key = get_payload_key(value)
+            else:
+                key = key_function(value)
+            hash(key)
+        except TypeError:
+            # Словарь со значениями, для которых ключ не строится
+            key = None
+
+        if key is None:
+            return cls._create_instance_from_dict__vdc(value)
+
+        result = cache.get(key)
+        if result is None:
+            # Копия - чтобы изменения исходного словаря не попадали в
+            # ошибки из кэша
+            result = cls._create_instance_from_dict__vdc(dict(value))
+            instance = result[0]
+            if instance is None or all(
+                type(getattr(instance, name)) in PAYLOAD_KEY_TYPES
+                for name in cls._get_plan_fields__vdc()
+            ):
+                cache.put(key, result)
+
+        return result
+
+    @classmethod
+    def _get_instance_cache__vdc(cls) -> Optional['InstanceCache']:
+        """
+            Возвращает кэш результатов создания экземпляров класса или
+            None, если кэш выключен.
+        """
+        cache = cls.__dict__.get('_instance_cache__vdc')
+        if cache is None:
+            if not cls._instance_cache_size__vdc:
+                return None
+            cache = InstanceCache(cls._instance_cache_size__vdc)
+            cls._instance_cache__vdc = cache
+        return cache
+
+    @classmethod
+    def get_instance_cache_info(cls) -> Optional[dict]:
+        """
+            Возвращает статистику кэша результатов создания экземпляров
+            класса (hits, misses, evictions, maxsize, currsize) или None,
+            если кэш выключен.
+        """
+        cache = cls._get_instance_cache__vdc()
+        return None if cache is None else cache.get_info()
+
+    @classmethod
+    def clear_instance_cache(cls) -> None:
+        """
+            Очищает кэш результатов создания экземпляров класса и его
+            статистику.
+        """
+        cache = cls._get_instance_cache__vdc()
+        if cache is not None:
+            cache.clear()
+
+    @classmethod
+    def validate_dict(
+        cls, data: dict, fail_fast: Optional[bool] = None
+    ) -> Optional[dict]:
+        """
+            Проверяет, можно ли создать валидный экземпляр класса из
+            словаря data, не создавая ни сам экземпляр, ни экземпляры
+            вложенных классов.
+
+            Возвращает словарь ошибок (как get_errors()) или None, если
+            ошибок нет. Отсутствующие обязательные и лишние ключи
+            описываются ошибками KeyValidationError.
+
+            Значения по умолчанию у отсутствующих полей не проверяются, а
+            __post_init__() не вызывается.
+        """
+        if not isinstance(data, dict):
+            raise TypeError(
+                f'{cls.__name__}.validate_dict() expects a dict, '
+                f'got {type(data).__name__}'
+            )
+
+        errors = cls._validate_dict__vdc(data, fail_fast)
+
+        return build_errors(errors) if errors else None
+
+    @classmethod
+    def _validate_dict__vdc(
+        cls, value: dict, fail_fast: Optional[bool] = None
+    ) -> Optional[dict]:
+        """
+            Проверяет словарь value по плану валидации класса без создания
+            экземпляров. Возвращает словарь отложенных ошибок или None.
+        """
+        # Методы проверки вызываются у заготовки экземпляра, которая
+        # во время проверки не изменяется
+        prototype = cls._get_prototype__vdc()
+
+        ctx = prototype._init_validation()
+        ctx.fail_fast = cls._fail_fast__vdc if fail_fast is None \
+            else fail_fast
+        ctx.build_instances = False
+        ctx.data = value
+
+        key_errors = cls._get_key_errors__vdc(value)
+        if key_errors:
+            if ctx.fail_fast:
+                return key_errors
+            ctx.errors.update(key_errors)
+
+        profiler = _profiler
+
+        for field in cls._get_validation_plan__vdc():
+            if not field.init or field.name not in value:
+                continue
+            if profiler is None:
+                is_valid_field = prototype._is_field_valid__vdc(field, ctx)
+            else:
+                is_valid_field = profiler.call(
+                    'fields', f'{cls.__qualname__}.{field.name}',
+                    prototype._is_field_valid__vdc, field, ctx
+                )
+            if not is_valid_field:
+                prototype._save_current_field_errors(ctx)
+                if ctx.fail_fast:
+                    break
+
+        return ctx.errors or None
+
+    @classmethod
+    def _get_key_errors__vdc(cls, value: dict) -> dict:
+        """
+            Возвращает ошибки ключей словаря value (отсутствующие
+            обязательные и лишние ключи) для создания экземпляра класса:
+            {ключ: [отложенная ошибка KeyValidationError]}.
+        """
+        required, allowed = cls._get_init_keys__vdc()
+        errors = {}
+
+        if not value.keys() >= required:
+            field_types = cls._get_field_types__vdc()
+            for key in required:
+                if key not in value:
+                    errors[key] = [LazyError(
+                        KeyValidationError, key,
+                        annotation=field_types.get(key), missing=True
+                    )]
+
+        if allowed is not None and not allowed.issuperset(value):
+            for key in value:
+                if key not in allowed:
+                    errors[key] = [LazyError(
+                        KeyValidationError, key,
+                        annotation=None, missing=False
+                    )]
+
+        return errors
+
+    @classmethod
+    def _get_init_keys__vdc(cls) -> Tuple[frozenset, Optional[frozenset]]:
+        """
+            Возвращает кортеж (обязательные аргументы __init__(), все
+            допустимые имена аргументов или None, если допустимы любые).
+
+            Вычисляется один раз по сигнатуре класса и сохраняется в нем.
+        """
+        init_keys = cls.__dict__.get('_init_keys__vdc')
+        if init_keys is None:
+            required = set()
+            allowed = set()
+            for parameter in inspect.signature(cls).parameters.values():
+                if parameter.kind == parameter.VAR_KEYWORD:
+                    allowed = None
+                elif parameter.kind != parameter.VAR_POSITIONAL:
+                    if parameter.default is parameter.empty:
+                        required.add(parameter.name)
+                    if allowed is not None:
+                        allowed.add(parameter.name)
+            init_keys = (
+                frozenset(required),
+                None if allowed is None else frozenset(allowed)
+            )
+            cls._init_keys__vdc = init_keys
+        return init_keys
+
+    @classmethod
+    def _get_prototype__vdc(cls) -> 'InstanceValidation':
+        """
+            Возвращает заготовку экземпляра класса (созданную без вызова
+            __init__()), у которой вызываются методы проверки в
+            validate_dict().
+        """
+        prototype = cls.__dict__.get('_prototype__vdc')
+        if prototype is None:
+            prototype = cls.__new__(cls)
+            cls._prototype__vdc = prototype
+        return prototype
+
+    @classmethod
+    def iter_validate(cls, items: Iterable) -> Iterator[Tuple[int, Any]]:
+        """
+            Потоковая валидация.
+
+            Генератор, который по одному берет элементы из items (словари,
+            уже созданные экземпляры или строки json, например строки
+            файла в формате JSON Lines) и отдает кортежи
+            (индекс элемента, валидный экземпляр) или
+            (индекс элемента, список ошибок).
+
+            Ни входные данные, ни результаты целиком в памяти не хранятся.
+            Пустые строки пропускаются.
+        """
+        # План валидации класса строится один раз для всего потока
+        cls._get_validation_plan__vdc()
+
+        create_instance = cls._create_instance__vdc
+
+        for index, item in enumerate(items):
+
+            if isinstance(item, (str, bytes, bytearray)):
+                if not item.strip():
+                    continue
+                try:
+                    item = json.loads(item)
+                except ValueError as exc:
+                    yield index, [BasicValidationError(
+                        value_repr=get_value_repr(item),
+                        value_type=type(item), annotation=cls, exception=exc
+                    )]
+                    continue
+
+            instance, error = create_instance(item)
+            if error is None:
+                yield index, instance
+            else:
+                yield index, build_errors([error])
+
+    @classmethod
+    def validate_many(cls, items: Iterable) -> Tuple[list, dict]:
+        """
+            Пакетная валидация.
+
+            Создает экземпляры класса из всех элементов items (так же, как
+            iter_validate()) и возвращает кортеж
+            (список валидных экземпляров, словарь {индекс элемента: список
+            его ошибок}).
+
+            Словари обрабатываются в цикле без генератора и без
+            предварительной проверки ключей (см.
+            _create_batch_instance__vdc()), поэтому накладные расходы на
+            элемент - один вызов метода по сравнению с циклом
+            [cls(**item) for item in items].
+        """
+        instances = []
+        errors = {}
+
+        append = instances.append
+        if cls._get_instance_cache__vdc() is None:
+            create_instance = cls._create_batch_instance__vdc
+        else:
+            create_instance = cls._create_instance__vdc
+
+        for index, item in enumerate(items):
+            if type(item) is dict:
+                instance, error = create_instance(item)
+                if error is None:
+                    append(instance)
+                else:
+                    errors[index] = build_errors([error])
+                continue
+
+            # Экземпляры и строки json - так же, как в iter_validate()
+            for _, result in cls.iter_validate((item, )):
+                if isinstance(result, list):
+                    errors[index] = result
+                else:
+                    append(result)
+
+        return instances, errors
+
+    @classmethod
+    def _create_batch_instance__vdc(
+        cls, value: dict
+    ) -> Tuple[Optional['InstanceValidation'], Optional[LazyError]]:
+        """
+            Создает экземпляр класса из словаря value для validate_many()
+            (результат - как у _create_instance_from_dict__vdc()).
+
+            Элементы пакета обычно подходят классу, поэтому, в отличие от
+            вложенных словарей (которые, например, в Union проверяются
+            несколькими классами), ключи проверяются только после того,
+            как __init__() не принял словарь.
+        """
+        exception = None
+
+        try:
+            instance = cls(**value)
+            errors = instance._errors__vdc or None
+        except Exception as exc:
+            errors = None
+            if isinstance(exc, TypeError):
+                errors = cls._get_key_errors__vdc(value) or None
+            if errors is None:
+                exception = exc
+
+        if errors is None and exception is None:
+            return instance, None
+
+        return None, LazyError(
+            InstanceValidationError, value,
+            annotation=cls, exception=exception, errors=errors
+        )
+
+    @classmethod
+    def validate_parallel(
+        cls, items: Sequence, max_workers: Optional[int] = None,
+        chunk_size: int = PARALLEL_CHUNK_SIZE
+    ) -> Tuple[list, dict]:
+        """
+            Пакетная валидация в пуле процессов.
+
+            Делит items на части по chunk_size элементов и валидирует их
+            в ProcessPoolExecutor(max_workers). Возвращает, как и
+            validate_many(), кортеж (список валидных экземпляров, словарь
+            {индекс элемента: список его ошибок}) в порядке следования
+            элементов, но ошибки - в виде serialize_errors(), так как
+            исключения в них не всегда можно передать между процессами.
+
+            Класс должен быть доступен для импорта в дочерних процессах
+            (то есть, объявлен на уровне модуля).
+        """
+        if chunk_size < 1:
+            raise ValueError('chunk_size must be greater than 0')
+
+        starts = range(0, len(items), chunk_size)
+
+        instances = []
+        errors = {}
+
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            chunk_results = executor.map(
+                _validate_chunk,
+                [cls] * len(starts),
+                starts,
+                [items[start:start+chunk_size] for start in starts]
+            )
+            for chunk_instances, chunk_errors in chunk_results:
+                instances.extend(chunk_instances)
+                errors.update(chunk_errors)
+
+        return instances, errors
+
+    def _init_field_validation(
+        self, field: DataclassesField, ctx: ValidationContext
+    ) -> None:
+
+        super()._init_field_validation(field, ctx)
+
+        # Свойство предназначенное для замены словаря
+        ctx.replacement = None
+
+    def _try_replacing(self, ctx: ValidationContext) -> None:
+        """
+            Пытается запланировать замену значения у текущего поля на
+            значение ctx.replacement.
+
+            Сама замена выполняется после проверки всех полей, в
+            _finish_validation().
+        """
+        # Если включен флаг замены и есть чем заменять, то запомним
+        # новое значение для поля
+        if ctx.is_replace and ctx.replacement is not None:
+            ctx.replacements[ctx.field_name] = ctx.replacement
+
+    def _is_field_valid__vdc(
+        self, field: DataclassesField, ctx: ValidationContext
+    ) -> bool:
+
+        result = super()._is_field_valid__vdc(field, ctx)
+
+        if result:
+            # Попробуем произвести замену
+            self._try_replacing(ctx)
+
+        return result
+
+    def _finish_validation(self, ctx: ValidationContext) -> None:
+
+        for field_name, replacement in ctx.replacements.items():
+            object.__setattr__(self, field_name, replacement)
+
+        super()._finish_validation(ctx)
+
+
+def _validate_chunk(
+    cls: type, start: int, items: Sequence
+) -> Tuple[list, dict]:
+    """
+        Валидирует часть пакета в дочернем процессе для
+        InstanceValidation.validate_parallel(). Индексы ошибок отсчитываются
+        от start, а сами ошибки переводятся в сериализуемый вид.
+    """
+    instances, errors = cls.validate_many(items)
+
+    return instances, {
+        start + index: serialize_errors(item_errors)
+        for index, item_errors in errors.items()
+    }
+
+
+# ----------------------------------------------------------------------------
+
+
+# Строковые представления для всех поддерживаемых алиасов:
+STR_ALIASES = {
+    List: str(List),
+    Union: str(Union),
+    Optional: str(Optional),
+    Any: str(Any),
+    Literal: str(Literal),
+    Dict: str(Dict),
+    Mapping: str(Mapping),
+    Tuple: str(Tuple),
+    Set: str(Set),
+    FrozenSet: str(FrozenSet),
+    Sequence: str(Sequence)
+}
+
+# Методы проверки алиасов по их исходному типу (typing.get_origin()).
+# Подходят и для алиасов из модуля typing (List[int], Optional[int]), и для
+# аннотаций вида list[int] и int | None
+ORIGIN_METHODS = {
+    Union: '_is_union_instance',
+    list: '_is_list_instance',
+    Literal: '_is_literal_instance',
+    dict: '_is_dict_instance',
+    collections.abc.Mapping: '_is_dict_instance',
+    tuple: '_is_tuple_instance',
+    set: '_is_set_instance',
+    frozenset: '_is_set_instance',
+    collections.abc.Sequence: '_is_sequence_instance',
+}
+if UnionType is not None:
+    ORIGIN_METHODS[UnionType] = '_is_union_instance'
+
+# Методы проверки алиасов без исходного типа (в том числе Union, Optional
+# и Literal без параметров)
+SPECIAL_FORM_METHODS = (
+    (Any, '_is_any_instance'),
+    (Union, '_is_union_instance'),
+    (Optional, '_is_union_instance'),
+    (Literal, '_is_literal_instance'),
+)
+
+# Модули, объекты которых (не классы) считаются алиасами
+TYPING_MODULES = ('typing', 'typing_extensions')
+
+# Максимальное количество разобранных аннотаций, которые хранятся в кэше.
+# Во время валидации этот общий кэш не используется: аннотации полей
+# разбираются один раз и хранятся в самом классе (см.
+# TypingValidation._get_annotation_plans__vdc()).
+ANNOTATION_CACHE_SIZE = 1024
+
+
+def _make_alias_info(annotation: Any) -> Tuple[bool, Optional[str]]:
+    """
+        Вычисляет по исходному типу аннотации кортеж (является ли аннотация
+        алиасом, имя метода для проверки алиаса или None если алиас не
+        поддерживается).
+    """
+    origin = get_origin(annotation)
+    if origin is not None:
+        return True, ORIGIN_METHODS.get(origin)
+
+    for special_form, method_name in SPECIAL_FORM_METHODS:
+        if annotation is special_form:
+            return True, method_name
+
+    if isinstance(annotation, type):
+        return False, None
+
+    return type(annotation).__module__ in TYPING_MODULES, None
+
+
+@lru_cache(maxsize=ANNOTATION_CACHE_SIZE)
+def _get_hashable_alias_info(annotation: Any) -> Tuple[bool, Optional[str]]:
+    """
+        Кэширующая обертка над _make_alias_info() для хешируемых аннотаций.
+    """
+    return _make_alias_info(annotation)
+
+
+# Кэш для нехешируемых аннотаций (например, Literal[[1, 2]]), ключ - id()
+# аннотации. Сама аннотация хранится вместе с результатом, чтобы ее id не
+# мог достаться другому объекту.
+_unhashable_alias_info = {}
+_unhashable_alias_info_stats = {'hits': 0, 'misses': 0}
+_unhashable_alias_info_lock = threading.Lock()
+
+
+def get_alias_info(annotation: Any) -> Tuple[bool, Optional[str]]:
+    """
+        Возвращает кортеж (является ли аннотация алиасом из модуля typing,
+        имя метода для проверки алиаса или None если алиас не
+        поддерживается).
+
+        Результаты хранятся в ограниченном потокобезопасном кэше.
+    """
+    try:
+        return _get_hashable_alias_info(annotation)
+    except TypeError:
+        pass
+
+    key = id(annotation)
+
+    with _unhashable_alias_info_lock:
+        cached = _unhashable_alias_info.get(key)
+        if cached is not None:
+            _unhashable_alias_info_stats['hits'] += 1
+            return cached[1]
+        _unhashable_alias_info_stats['misses'] += 1
+
+    alias_info = _make_alias_info(annotation)
+
+    with _unhashable_alias_info_lock:
+        if len(_unhashable_alias_info) >= ANNOTATION_CACHE_SIZE:
+            # Удалим самую старую запись
+            del _unhashable_alias_info[next(iter(_unhashable_alias_info))]
+        _unhashable_alias_info[key] = (annotation, alias_info)
+
+    return alias_info
+
+
+def get_item_annotation(annotation: Any) -> Any:
+    """
+        Возвращает аннотацию элементов у алиаса с одним аргументом
+        (например, int для List[int] и list[int]), или Any, если аргумента
+        нет (например, у List без параметров).
+    """
+    args = get_args(annotation)
+    return args[0] if args else Any
+
+
+@dataclass(frozen=True)
+class UnionIndex:
+    """
+        Индекс для выбора класса-потомка InstanceValidation из Union по
+        словарю (без попыток создать экземпляры всех классов по очереди).
+    """
+    classes: frozenset  # Классы-потомки InstanceValidation из Union
+    tag_name: Optional[str]  # Имя общего для классов поля-тега
+    tag_classes: dict   # {значение тега: класс}
+    key_classes: dict   # {имя поля, которое есть только у одного класса: он}
+
+    def get_class(self, value: dict) -> Optional[type]:
+        """
+            Возвращает единственный класс, экземпляр которого можно
+            попытаться создать из словаря value, или None, если выбрать
+            такой класс нельзя.
+        """
+        if self.tag_name is not None and self.tag_name in value:
+            try:
+                return self.tag_classes.get(value[self.tag_name])
+            except TypeError:  # Нехешируемое значение тега
+                return None
+
+        result = None
+        for key in value:
+            cls = self.key_classes.get(key)
+            if cls is not None and cls is not result:
+                if result is not None:
+                    # Ключи от разных классов, ни один класс не подходит
+                    return None
+                result = cls
+
+        return result
+
+
+def _get_tag_values(cls: type, tag_name: str) -> Optional[tuple]:
+    """
+        Возвращает значения поля-тега класса: аргументы Literal из его
+        аннотации или значение по умолчанию.
+    """
+    for field in dataclasses_fields(cls):
+        if field.name == tag_name:
+            annotation = cls._get_field_types__vdc()[field.name]
+            if get_alias_info(annotation)[1] == '_is_literal_instance':
+                return get_args(annotation)
+            if field.default is not MISSING:
+                return (field.default, )
+    return None
+
+
+@lru_cache(maxsize=ANNOTATION_CACHE_SIZE)
+def _get_hashable_union_index(annotation: Any) -> Optional[UnionIndex]:
+    """
+        Строит индекс UnionIndex для Union, если в нем не меньше двух
+        классов-потомков InstanceValidation.
+    """
+    classes = tuple(
+        item for item in get_args(annotation)
+        if type(item) == type and issubclass(item, InstanceValidation)
+    )
+    if len(classes) < 2:
+        return None
+
+    # Индекс по тегу - если у всех классов объявлено одно и то же поле-тег
+    # с разными значениями
+    tag_name = classes[0]._discriminator__vdc
+    tag_classes = {}
+    if tag_name is not None:
+        for cls in classes:
+            tag_values = None
+            if cls._discriminator__vdc == tag_name:
+                tag_values = _get_tag_values(cls, tag_name)
+            try:
+                if tag_values is None or any(
+                    tag_value in tag_classes for tag_value in tag_values
+                ):
+                    raise ValueError('Tag values are not unique')
+                for tag_value in tag_values:
+                    tag_classes[tag_value] = cls
+            except (TypeError, ValueError):
+                tag_name = None
+                tag_classes = {}
+                break
+
+    # Индекс по именам полей, которые есть только у одного из классов:
+    # словарь с таким ключом не подойдет ни одному другому классу
+    key_owners = {}
+    for cls in classes:
+        for field in dataclasses_fields(cls):
+            if field.init:
+                key_owners.setdefault(field.name, set()).add(cls)
+    key_classes = {
+        name: owners.pop()
+        for name, owners in key_owners.items() if len(owners) == 1
+    }
+
+    return UnionIndex(
+        classes=frozenset(classes), tag_name=tag_name,
+        tag_classes=tag_classes, key_classes=key_classes
+    )
+
+
+def get_union_index(annotation: Any) -> Optional[UnionIndex]:
+    """
+        Возвращает (кэшированный) индекс UnionIndex для аннотации Union или
+        None, если индекс не нужен или его нельзя построить.
+    """
+    try:
+        return _get_hashable_union_index(annotation)
+    except TypeError:  # Нехешируемая аннотация
+        return None
+
+
+def _get_literal_key(value: Any) -> Tuple[Any, bool]:
+    """
+        Ключ значения для поиска среди значений Literal.
+
+        True == 1 и False == 0, поэтому кроме самого значения ключ
+        учитывает, является ли значение bool.
+    """
+    return value, type(value) is bool
+
+
+@dataclass(frozen=True)
+class LiteralValues:
+    """
+        Значения аннотации Literal, подготовленные для быстрой проверки.
+    """
+    values: tuple          # Все значения Literal (аргументы аннотации)
+    keys: frozenset        # Ключи _get_literal_key() хешируемых значений
+    unhashable: tuple      # Нехешируемые значения
+
+    def __contains__(self, value: Any) -> bool:
+        try:
+            if _get_literal_key(value) in self.keys:
+                return True
+        except TypeError:  # Нехешируемое значение
+            pass
+
+        is_bool = type(value) is bool
+        for item in self.unhashable:
+            if item == value and (type(item) is bool) == is_bool:
+                return True
+
+        return False
+
+
+def _make_literal_values(annotation: Any) -> LiteralValues:
+    """
+        Готовит значения аннотации Literal для быстрой проверки.
+    """
+    values = get_args(annotation)
+    keys = set()
+    unhashable = []
+
+    for item in values:
+        try:
+            keys.add(_get_literal_key(item))
+        except TypeError:
+            unhashable.append(item)
+
+    return LiteralValues(
+        values=values, keys=frozenset(keys),
+        unhashable=tuple(unhashable)
+    )
+
+
+@lru_cache(maxsize=ANNOTATION_CACHE_SIZE)
+def _get_hashable_literal_values(annotation: Any) -> LiteralValues:
+    """
+        Кэширующая обертка над _make_literal_values() для хешируемых
+        аннотаций.
+    """
+    return _make_literal_values(annotation)
+
+
+def get_literal_values(annotation: Any) -> LiteralValues:
+    """
+        Возвращает (кэшированные) значения LiteralValues аннотации Literal.
+    """
+    try:
+        return _get_hashable_literal_values(annotation)
+    except TypeError:  # Нехешируемая аннотация
+        return _make_literal_values(annotation)
+
+
+@dataclass(frozen=True)
+class AnnotationPlan:
+    """
+        Разобранная аннотация: все, что нужно для ее проверки без
+        обращения к общим кэшам аннотаций.
+    """
+    annotation: Any             # Сама аннотация
+    is_alias: bool              # Является ли алиасом из модуля typing
+    method_name: Optional[str]  # Имя метода проверки алиаса
+    item_annotation: Any        # Аннотация элементов (у List, Set и т.п.)
+    union_index: Optional[UnionIndex] = None        # Индекс Union
+    literal_values: Optional[LiteralValues] = None  # Значения Literal
+
+
+def clear_annotation_cache() -> None:
+    """
+        Очищает кэш разобранных аннотаций.
+    """
+    _get_hashable_alias_info.cache_clear()
+    _get_hashable_union_index.cache_clear()
+    _get_hashable_literal_values.cache_clear()
+
+    with _unhashable_alias_info_lock:
+        _unhashable_alias_info.clear()
+        _unhashable_alias_info_stats['hits'] = 0
+        _unhashable_alias_info_stats['misses'] = 0
+
+
+def get_annotation_cache_info() -> dict:
+    """
+        Отдает статистику кэша разобранных аннотаций.
+    """
+    info = _get_hashable_alias_info.cache_info()
+
+    with _unhashable_alias_info_lock:
+        return {
+            'hits': info.hits + _unhashable_alias_info_stats['hits'],
+            'misses': info.misses + _unhashable_alias_info_stats['misses'],
+            'maxsize': info.maxsize,
+            'currsize': info.currsize,
+            'unhashable_currsize': len(_unhashable_alias_info),
+        }
+
+
+@dataclass
+class TypingValidationError(BasicValidationError):
+    pass
+
+
+@dataclass
+class ListValidationError:
+    item_index: int
+    item_repr:  str   # Строковое представление элемента или его части
+    item_type:  type  # Тип элемента
+    annotation: type  # Тип в аннотации
+
+    # Имена полей для LazyError.build()
+    _value_fields__vdc = ('item_repr', 'item_type')
+
+
+@dataclass
+class LiteralValidationError:
+    literal_repr: str   # Строковое представление литерала или его части
+    literal_type: type  # Тип литерала
+    annotation: type    # Тип в аннотации
+    literal_values: Optional[tuple] = None  # Допустимые значения Literal
+
+    # Имена полей для LazyError.build()
+    _value_fields__vdc = ('literal_repr', 'literal_type')
+
+
+@dataclass
+class DictValidationError:
+    key_repr: str     # Строковое представление ключа или его части
+    key_type: type    # Тип ключа
+    annotation: type  # Тип в аннотации
+    is_key: bool      # Невалиден сам ключ (иначе - значение по ключу)
+
+    # Имена полей для LazyError.build()
+    _value_fields__vdc = ('key_repr', 'key_type')
+
+
+@dataclass
+class TypingValidation(InstanceValidation):
+    """
+        Добавляет для использования в аннотациях некоторые алиасы из модуля
+        typing.
+
+        Поддерживаемые алиасы перечислены в константе STR_ALIASES.
+    """
+    __slots__ = ()
+
+    def _is_instance__vdc(
+        self, value: Any, annotation: type, ctx: ValidationContext
+    ) -> bool:
+
+        # Разобранная аннотация ищется по id() в словаре класса, без
+        # вычисления хеша самой аннотации
+        plans = ctx.annotation_plans
+        plan = None if plans is None else plans.get(id(annotation))
+        if plan is None:
+            plan = self._make_annotation_plan__vdc(annotation)
+
+        if plan.is_alias:
+
+            method_name = plan.method_name
+
+            if method_name is None:
+
+                if not ctx.fail_fast:
+                    exception = TypeError('Alias is not supported!')
+                    ctx.field_errors.append(LazyError(
+                        TypingValidationError, value,
+                        annotation=annotation, exception=exception
+                    ))
+                return False
+
+            is_instance = getattr(self, method_name)
+
+            ctx.typing_field_error = None
+            profiler = _profiler
+            if profiler is None:
+                result = is_instance(value, annotation, ctx)
+            else:
+                # Вид аннотации - имя метода без '_is_' и '_instance'
+                result = profiler.call(
+                    'annotations', method_name[4:-9],
+                    is_instance, value, annotation, ctx
+                )
+            if result:
+                return True
+            else:
+                if ctx.typing_field_error is not None:
+                    ctx.field_errors.append(ctx.typing_field_error)
+                    ctx.typing_field_error = None
+                return False
+
+        return super()._is_instance__vdc(value, annotation, ctx)
+
+    def _init_validation(self) -> ValidationContext:
+
+        ctx = super()._init_validation()
+        ctx.annotation_plans = self._get_annotation_plans__vdc()
+
+        return ctx
+
+    @classmethod
+    def _build_validation_plan__vdc(cls) -> tuple:
+
+        plan = super()._build_validation_plan__vdc()
+
+        # Разбор аннотаций всех полей выполняется один раз, при построении
+        # плана, а не при каждой валидации экземпляра
+        cls._get_annotation_plans__vdc()
+
+        return plan
+
+    @classmethod
+    def _get_annotation_plans__vdc(cls) -> dict:
+        """
+            Возвращает разобранные аннотации полей класса (и все вложенные
+            в них аннотации) в словаре {id(аннотация): AnnotationPlan}.
+
+            Словарь строится один раз и сохраняется в самом классе. Он
+            хранит и сами аннотации, поэтому их id() не могут достаться
+            другим объектам.
+        """
+        plans = cls.__dict__.get('_annotation_plans__vdc')
+        if plans is None:
+            plans = {}
+            for annotation in cls._get_field_types__vdc().values():
+                cls._compile_annotation__vdc(annotation, plans)
+            if cls._has_resolved_field_types__vdc():
+                cls._annotation_plans__vdc = plans
+        return plans
+
+    @classmethod
+    def _compile_annotation__vdc(cls, annotation: Any, plans: dict) -> None:
+        """
+            Разбирает аннотацию (и все вложенные в нее аннотации) и
+            добавляет результат в словарь plans.
+        """
+        if id(annotation) in plans:
+            return
+
+        plan = cls._make_annotation_plan__vdc(annotation)
+        plans[id(annotation)] = plan
+
+        if plan.is_alias and plan.method_name != '_is_literal_instance':
+            # У Literal в аргументах значения, а не аннотации
+            for item_annotation in get_args(annotation):
+                cls._compile_annotation__vdc(item_annotation, plans)
+
+    @classmethod
+    def _make_annotation_plan__vdc(cls, annotation: Any) -> AnnotationPlan:
+        """
+            Разбирает одну аннотацию (с использованием общих кэшей
+            аннотаций).
+        """
+        is_alias, method_name = cls._get_alias_info__vdc(annotation)
+
+        return AnnotationPlan(
+            annotation=annotation, is_alias=is_alias, method_name=method_name,
+            item_annotation=get_item_annotation(annotation) if is_alias
+            else None,
+            union_index=get_union_index(annotation)
+            if method_name == '_is_union_instance' else None,
+            literal_values=get_literal_values(annotation)
+            if method_name == '_is_literal_instance' else None,
+        )
+
+    def _get_annotation_plan__vdc(
+        self, annotation: Any, ctx: ValidationContext
+    ) -> AnnotationPlan:
+        """
+            Возвращает разобранную аннотацию: из словаря класса, если она
+            там есть, иначе - разбирает ее.
+        """
+        plans = ctx.annotation_plans
+        if plans is not None:
+            plan = plans.get(id(annotation))
+            if plan is not None:
+                return plan
+        return self._make_annotation_plan__vdc(annotation)
+
+    @staticmethod
+    def _get_alias_info__vdc(
+        annotation: Any
+    ) -> Tuple[bool, Optional[str]]:
+        """
+            Возвращает кортеж (является ли аннотация алиасом из модуля typing,
+            имя метода для проверки алиаса или None если алиас не
+            поддерживается).
+        """
+        return get_alias_info(annotation)
+
+    @staticmethod
+    def _is_typing_alias(annotation: Any) -> bool:
+        """
+            Проверяет является ли annotation алиасом из модуля typing
+        """
+        return get_alias_info(annotation)[0]
+
+    @staticmethod
+    def _is_supported_alias(annotation: Any) -> bool:
+        """
+            Проверяет является ли annotation поддерживаемым алиасом
+        """
+        return get_alias_info(annotation)[1] is not None
+
+    def _get_alias_method(self, annotation: Any) -> Optional[Callable]:
+        """
+            Возавращает метод для проверки алиаса
+        """
+        method_name = get_alias_info(annotation)[1]
+
+        if method_name is not None:
+            return getattr(self, method_name)
+
+    def _is_union_instance(
+        self, value: Any, annotation: type, ctx: ValidationContext
+    ) -> bool:
+        """
+            Валидация на алиасы Optional и Union.
+
+            Проверяет является ли value экземпляром одного из типов из
+            кортежа.
+
+            Если value - словарь, а в Union несколько классов-потомков
+            InstanceValidation, то по индексу UnionIndex (по значению
+            поля-тега или по ключам, которые есть только у одного из
+            классов) сразу выбирается единственный подходящий класс, а
+            создание экземпляров остальных классов (и их ошибки)
+            пропускается.
+        """
+        errors_count = len(ctx.field_errors)
+
+        skipped_classes = ()
+        if isinstance(value, dict):
+            union_index = self._get_annotation_plan__vdc(
+                annotation, ctx
+            ).union_index
+            if union_index is not None:
+                cls = union_index.get_class(value)
+                if cls is not None:
+                    skipped_classes = union_index.classes - {cls}
+
+        # У Union допустимые типы перечислены в его аргументах
+        for item_annotation in get_args(annotation):
+            if type(item_annotation) == type and \
+                    item_annotation in skipped_classes:
+                continue
+            if self._is_instance__vdc(value, item_annotation, ctx):
+                # Ошибки от неподошедших типов больше не нужны
+                del ctx.field_errors[errors_count:]
+                return True
+        # Нет ни одного типа, подходящего для value
+        return False
+
+    def _is_list_instance(
+        self, value: Any, annotation: type, ctx: ValidationContext
+    ) -> bool:
+        """
+            Валидация на алиас List.
+
+            Проверяет является ли value списком экземпляров annotation.
+        """
+        if isinstance(value, list):
+            # У List допустимый тип - его единственный аргумент (если
+            # аргумента нет, то допустим любой тип)
+            plan = self._get_annotation_plan__vdc(annotation, ctx)
+            return self._is_items_instance(value, plan.item_annotation, ctx)
+
+        if not ctx.fail_fast:
+            ctx.typing_field_error = LazyError(
+                BasicValidationError, value,
+                annotation=annotation, exception=None
+            )
+
+        return False
+
+    def _is_items_instance(
+        self, value: Iterable, annotation: Any, ctx: ValidationContext
+    ) -> bool:
+        """
+            Проверяет что все элементы value (списка, кортежа, множества и
+            т.п.) - экземпляры annotation.
+
+            Если какие-либо элементы-словари были заменены на экземпляры
+            потомков InstanceValidation, то в ctx.replacement будет новый
+            список элементов, иначе - None.
+        """
+        ctx.replacement = None
+
+        if annotation is Any:
+            return True
+
+        if type(annotation) == type and \
+                not issubclass(annotation, InstanceValidation):
+            # Простой тип элементов (int, str и т.п.): замены элементов
+            # не будет, и для каждого из типов элементов достаточно
+            # одной проверки
+            return self._is_simple_list_instance(value, annotation, ctx)
+
+        # В родительском классе возможна замена значения-словаря на
+        # значение-экземпляр потомка родительского класса. То есть,
+        # возможно изменение элементов value.
+        # Новый список создается только при первой такой замене (до нее
+        # он совпадает с value), иначе остается исходное значение.
+        new_value = None
+
+        for i, item_value in enumerate(value):
+            ctx.replacement = None
+            if self._is_instance__vdc(item_value, annotation, ctx):
+                if ctx.replacement is not None:
+                    # Элемент заменяется: начинаем новый список с копии
+                    # уже проверенных (не замененных) элементов
+                    if new_value is None:
+                        new_value = list(islice(value, i))
+                    new_value.append(ctx.replacement)
+                elif new_value is not None:
+                    new_value.append(item_value)
+            else:
+                if not ctx.fail_fast:
+                    ctx.typing_field_error = LazyError(
+                        ListValidationError, item_value,
+                        item_index=i, annotation=annotation
+                    )
+                return False
+
+        # Все элементы value валидные. Если ни один из них не был
+        # заменен, то ctx.replacement равно None, и поле сохранит
+        # исходное значение
+        ctx.replacement = new_value
+        return True
+
+    def _is_simple_list_instance(
+        self, value: Iterable, annotation: type, ctx: ValidationContext
+    ) -> bool:
+        """
+            Проверяет что все элементы value - экземпляры класса
+            annotation, который не является потомком InstanceValidation.
+
+            Вместо проверки каждого элемента проверяются только различные
+            типы элементов, а новый список не создается.
+        """
+        for item_type in set(map(type, value)):
+            if not issubclass(item_type, annotation):
+                break
+        else:
+            return True
+
+        # Найдем первый невалидный элемент для сообщения об ошибке
+        for i, item_value in enumerate(value):
+            if not self._is_instance__vdc(item_value, annotation, ctx):
+                if not ctx.fail_fast:
+                    ctx.typing_field_error = LazyError(
+                        ListValidationError, item_value,
+                        item_index=i, annotation=annotation
+                    )
+                return False
+
+        # Сюда можно попасть, только если isinstance() элемента не совпал
+        # с issubclass() его типа (например, при подмене __class__)
+        return True  # pragma: no cover
+
+    def _is_tuple_instance(
+        self, value: Any, annotation: type, ctx: ValidationContext
+    ) -> bool:
+        """
+            Валидация на алиас Tuple.
+
+            Для Tuple[X, ...] проверяет является ли value кортежем
+            экземпляров X, а для Tuple[X, Y] - кортежем из двух элементов,
+            первый из которых экземпляр X, а второй - экземпляр Y.
+        """
+        if not isinstance(value, tuple):
+            if not ctx.fail_fast:
+                ctx.typing_field_error = LazyError(
+                    BasicValidationError, value,
+                    annotation=annotation, exception=None
+                )
+            return False
+
+        if annotation is Tuple:
+            args = (Any, Ellipsis)
+        else:
+            args = get_args(annotation)
+            if args == ((),):
+                # Tuple[()] в старых версиях Python
+                args = ()
+
+        if len(args) == 2 and args[1] is Ellipsis:
+            result = self._is_items_instance(value, args[0], ctx)
+            if result and ctx.replacement is not None:
+                ctx.replacement = tuple(ctx.replacement)
+            return result
+
+        ctx.replacement = None
+
+        if len(value) != len(args):
+            if not ctx.fail_fast:
+                exception = ValueError(
+                    'Tuple length must be {}'.format(len(args))
+                )
+                ctx.typing_field_error = LazyError(
+                    BasicValidationError, value,
+                    annotation=annotation, exception=exception
+                )
+            return False
+
+        new_value = None
+
+        for i, (item_value, item_annotation) in enumerate(zip(value, args)):
+            ctx.replacement = None
+            if self._is_instance__vdc(item_value, item_annotation, ctx):
+                if ctx.replacement is not None:
+                    if new_value is None:
+                        new_value = list(value[:i])
+                    new_value.append(ctx.replacement)
+                elif new_value is not None:
+                    new_value.append(item_value)
+            else:
+                if not ctx.fail_fast:
+                    ctx.typing_field_error = LazyError(
+                        ListValidationError, item_value,
+                        item_index=i, annotation=item_annotation
+                    )
+                return False
+
+        ctx.replacement = None if new_value is None else tuple(new_value)
+        return True
+
+    def _is_set_instance(
+        self, value: Any, annotation: type, ctx: ValidationContext
+    ) -> bool:
+        """
+            Валидация на алиасы Set и FrozenSet.
+
+            Проверяет является ли value множеством (для FrozenSet -
+            неизменяемым множеством) экземпляров annotation.
+
+            Индекс элемента в ошибке - порядковый номер элемента при обходе
+            множества.
+        """
+        set_type = set
+        if get_origin(annotation) is frozenset:
+            set_type = frozenset
+
+        if isinstance(value, set_type):
+            plan = self._get_annotation_plan__vdc(annotation, ctx)
+            result = self._is_items_instance(
+                value, plan.item_annotation, ctx
+            )
+            if result and ctx.replacement is not None:
+                ctx.replacement = set_type(ctx.replacement)
+            return result
+
+        if not ctx.fail_fast:
+            ctx.typing_field_error = LazyError(
+                BasicValidationError, value,
+                annotation=annotation, exception=None
+            )
+
+        return False
+
+    def _is_sequence_instance(
+        self, value: Any, annotation: type, ctx: ValidationContext
+    ) -> bool:
+        """
+            Валидация на алиас Sequence.
+
+            Проверяет является ли value последовательностью (списком,
+            кортежем и т.п.) экземпляров annotation.
+
+            При замене элементов кортеж остается кортежем, а любая другая
+            последовательность становится списком.
+        """
+        if isinstance(value, collections.abc.Sequence):
+            plan = self._get_annotation_plan__vdc(annotation, ctx)
+            result = self._is_items_instance(
+                value, plan.item_annotation, ctx
+            )
+            if result and ctx.replacement is not None and \
+                    isinstance(value, tuple):
+                ctx.replacement = tuple(ctx.replacement)
+            return result
+
+        if not ctx.fail_fast:
+            ctx.typing_field_error = LazyError(
+                BasicValidationError, value,
+                annotation=annotation, exception=None
+            )
+
+        return False
+
+    def _is_dict_instance(
+        self, value: Any, annotation: type, ctx: ValidationContext
+    ) -> bool:
+        """
+            Валидация на алиасы Dict и Mapping.
+
+            Проверяет является ли value словарем (для Mapping - любым
+            отображением), у которого ключи - экземпляры первого аргумента
+            annotation, а значения - второго.
+
+            Значения-словари заменяются на экземпляры потомков
+            InstanceValidation. При этом создается новый словарь (копия
+            value), а исходный не изменяется.
+        """
+        if get_origin(annotation) is dict:
+            is_dict = isinstance(value, dict)
+        else:
+            is_dict = isinstance(value, collections.abc.Mapping)
+
+        if not is_dict:
+            if not ctx.fail_fast:
+                ctx.typing_field_error = LazyError(
+                    BasicValidationError, value,
+                    annotation=annotation, exception=None
+                )
+            return False
+
+        key_annotation, value_annotation = get_args(annotation) or (Any, Any)
+
+        ctx.replacement = None
+
+        if key_annotation is not Any and not self._is_dict_keys_instance(
+            value, key_annotation, ctx
+        ):
+            return False
+
+        if value_annotation is Any:
+            return True
+
+        if type(value_annotation) == type and \
+                not issubclass(value_annotation, InstanceValidation):
+            # Простой тип значений: достаточно проверить различные типы
+            for item_type in set(map(type, value.values())):
+                if not issubclass(item_type, value_annotation):
+                    break
+            else:
+                return True
+
+        new_value = None
+
+        for key, item_value in value.items():
+            ctx.replacement = None
+            if self._is_instance__vdc(item_value, value_annotation, ctx):
+                if ctx.replacement is not None:
+                    if new_value is None:
+                        new_value = dict(value)
+                    new_value[key] = ctx.replacement
+            else:
+                if not ctx.fail_fast:
+                    ctx.typing_field_error = LazyError(
+                        DictValidationError, key,
+                        annotation=value_annotation, is_key=False
+                    )
+                return False
+
+        ctx.replacement = new_value
+        return True
+
+    def _is_dict_keys_instance(
+        self, value: Any, annotation: Any, ctx: ValidationContext
+    ) -> bool:
+        """
+            Проверяет что все ключи отображения value - экземпляры
+            annotation.
+        """
+        if type(annotation) == type:
+            # Ключи словаря хешируемые, поэтому потомков InstanceValidation
+            # среди них (в виде словарей) быть не может, и достаточно
+            # проверить различные типы ключей
+            for key_type in set(map(type, value)):
+                if not issubclass(key_type, annotation):
+                    break
+            else:
+                return True
+
+        for key in value:
+            if not self._is_instance__vdc(key, annotation, ctx):
+                if not ctx.fail_fast:
+                    ctx.typing_field_error = LazyError(
+                        DictValidationError, key,
+                        annotation=annotation, is_key=True
+                    )
+                return False
+
+        ctx.replacement = None
+        return True
+
+    def _is_literal_instance(
+        self, value: Any, annotation: type, ctx: ValidationContext
+    ) -> bool:
+        """
+            Валидация на алиас Literal.
+
+            Проверяет является ли value одним из аргументов annotation
+            (поиск по заранее подготовленному множеству значений, при этом
+            True не считается равным 1, а False - 0).
+        """
+        literal_values = self._get_annotation_plan__vdc(
+            annotation, ctx
+        ).literal_values
+        result = value in literal_values
+
+        if not result and not ctx.fail_fast:
+            ctx.typing_field_error = LazyError(
+                LiteralValidationError, value, annotation=annotation,
+                literal_values=literal_values.values
+            )
 
         return result
 
-    def _is_any_instance(self, value: Any, type_: type) -> bool:
+    def _is_any_instance(
+        self, value: Any, type_: type, ctx: ValidationContext
+    ) -> bool:
         """
             Валидация на алиас Any.
 
@@ -500,39 +2730,86 @@ class ValidatedDC(TypingValidation):
     """
         Добавляет в базовый класс метод get_nested_validated_dc(cls),
         который позволяет получать все вложенные датаклассы-потомки
-        ValidatedDC, которые используются в аннотациях полей.
+        ValidatedDC, которые используются в аннотациях полей, и метод
+        get_nested_validated_dc_order(cls), который отдает их в порядке
+        зависимостей.
     """
+    __slots__ = ()
+
     @classmethod
     def get_nested_validated_dc(cls) -> set:
         """
             Отдает все, используемые полями, датаклассы ValidatedDC
+            (включая используемые полями вложенных датаклассов)
         """
+        return set(cls.get_nested_validated_dc_order())
 
-        def get_field_validated_dc(annotation, set_validated_dc=None) -> set:
-            """
-                Возвращает все ValidatedDC классы которые используются в
-                аннотации у поля.
-            """
-            if set_validated_dc is None:
-                set_validated_dc = set()
-
-            if cls._is_typing_alias(str(annotation)):
-                if hasattr(annotation, '__args__'):
-                    for item in annotation.__args__:
-                        get_field_validated_dc(item, set_validated_dc)
-            elif type(annotation) == type and \
-                    issubclass(annotation, ValidatedDC):
-                set_validated_dc.add(annotation)
-
-            return set_validated_dc
-
-        local_validated_dc = set()
-        for field in dataclasses_fields(cls):
-            local_validated_dc.update(get_field_validated_dc(field.type))
+    @classmethod
+    def get_nested_validated_dc_order(cls) -> tuple:
+        """
+            Отдает все вложенные датаклассы ValidatedDC (те же, что и
+            get_nested_validated_dc()) в порядке зависимостей: каждый класс
+            идет после классов, которые используются его полями. Для
+            классов, которые ссылаются друг на друга, порядок определяется
+            обходом полей.
 
-        nested_validated_dc = copy.copy(local_validated_dc)
+            Результат вычисляется один раз и сохраняется в классе.
+        """
+        order = cls.__dict__.get('_nested_validated_dc__vdc')
+        if order is None:
+            order = []
+            visited = set()
+
+            def visit(validated_dc: type) -> None:
+                # Класс помечается до обхода его полей, поэтому на циклах
+                # обход останавливается
+                visited.add(validated_dc)
+                for item in validated_dc._get_local_validated_dc__vdc():
+                    if item not in visited:
+                        visit(item)
+                order.append(validated_dc)
+
+            for validated_dc in cls._get_local_validated_dc__vdc():
+                if validated_dc not in visited:
+                    visit(validated_dc)
+
+            order = tuple(order)
+            if cls._has_resolved_field_types__vdc() and all(
+                item._has_resolved_field_types__vdc() for item in order
+            ):
+                cls._nested_validated_dc__vdc = order
+
+        return order
 
-        for validated_dc in local_validated_dc:
-            nested_validated_dc.update(validated_dc.get_nested_validated_dc())
+    @classmethod
+    def _get_local_validated_dc__vdc(cls) -> tuple:
+        """
+            Отдает датаклассы ValidatedDC, которые используются в
+            аннотациях полей самого класса (без вложенных), в порядке
+            полей.
 
-        return nested_validated_dc
+            Результат вычисляется один раз и сохраняется в классе.
+        """
+        local_validated_dc = cls.__dict__.get('_local_validated_dc__vdc')
+        if local_validated_dc is None:
+            found = {}
+
+            def find(annotation: Any) -> None:
+                is_alias, method_name = cls._get_alias_info__vdc(annotation)
+                if is_alias:
+                    # У Literal в аргументах значения, а не аннотации
+                    if method_name != '_is_literal_instance':
+                        for item in get_args(annotation):
+                            find(item)
+                elif type(annotation) == type and \
+                        issubclass(annotation, ValidatedDC):
+                    found[annotation] = None
+
+            for annotation in cls._get_field_types__vdc().values():
+                find(annotation)
+
+            local_validated_dc = tuple(found)
+            if cls._has_resolved_field_types__vdc():
+                cls._local_validated_dc__vdc = local_validated_dc
+
+        return local_validated_dc